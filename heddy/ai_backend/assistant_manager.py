@@ -6,23 +6,27 @@ import threading
 import requests
 import json
 import logging
+import base64
 from heddy.application_event import ApplicationEvent, ApplicationEventType, ProcessingStatus
+from heddy.functions2call import TOOL_EVENT_TYPES
 from heddy.state_manager import StateManager
+from heddy.tracing import tracer
 from openai.lib.streaming import AssistantEventHandler
 from openai.types.beta import Assistant, Thread
 from openai.types.beta.threads import Run, RequiredActionFunctionToolCall, TextDelta
 from openai.types.beta.assistant_stream_event import (
-    ThreadRunRequiresAction, ThreadMessageDelta, ThreadRunCompleted,
+    ThreadRunCreated, ThreadRunRequiresAction, ThreadMessageDelta, ThreadRunCompleted,
     ThreadRunFailed, ThreadRunCancelling, ThreadRunCancelled, ThreadRunExpired, ThreadRunStepFailed,
     ThreadRunStepCancelled, ThreadRunStepDelta)
 from dataclasses import dataclass
 from heddy.io.sound_effects_player import AudioPlayer
-from heddy.vision_module import VisionModule
+from heddy.vision_module import ImagePrompt, VisionModule
 
 class AssistantResultStatus(Enum):
     SUCCESS = 1
     ERROR = -1
     ACTION_REQUIED = 2 
+    CANCELLED = 3
 
 class AvailableActions(Enum):
     ZAPIER=1
@@ -35,10 +39,13 @@ class AssitsantResult:
     response: Optional[str] = ""
     calls: Optional[Any] = None
     error: Optional[str] = ""
+    # True when the response was already spoken through the streaming TTS pipeline
+    streamed: bool = False
     
 class ThreadManager:
-    def __init__(self, client):
+    def __init__(self, client, audio_player=None):
         self.client = client
+        self.audio_player = audio_player
         self.thread_id = None
         self.interaction_in_progress = False
         self.reset_timer = None
@@ -58,13 +65,14 @@ class ThreadManager:
             return None
 
     def add_message_to_thread(self, content):
+        """Adds a user message to the thread and returns whether that worked."""
         if not self.thread_id:
             print("No thread ID set. Cannot add message.")
-            return
+            return False
 
         if self.interaction_in_progress:
             print("Previous interaction still in progress. Please wait.")
-            return
+            return False
 
         try:
             message = self.client.beta.threads.messages.create(
@@ -73,8 +81,10 @@ class ThreadManager:
                 content=content
             )
             print(f"Message added to thread: {self.thread_id}")
+            return True
         except Exception as e:
             print(f"Failed to add message to thread: {e}")
+            return False
 
     def handle_interaction(self, content):
         if not self.thread_id or not self.interaction_in_progress:
@@ -96,7 +106,7 @@ class ThreadManager:
             self.reset_thread()  # Reset the thread once the timer completes
             print("Last interaction time reset and thread reset")
             # Play the timer reset sound effect
-            audio_player = AudioPlayer()
+            audio_player = self.audio_player or AudioPlayer()
             audio_player.play_sound('timerreset.wav')  # Adjust the path as necessary
         
         # Cancel existing timer if it exists and is still running
@@ -115,22 +125,123 @@ class ThreadManager:
 
 
 class StreamingManager:
-    def __init__(self, thread_manager, eleven_labs_manager, assistant_id=None):
+    # Snapshots can be attached to the thread message as images
+    supports_images = True
+
+    def __init__(self, thread_manager, eleven_labs_manager, assistant_id=None, tts_pipeline=None, vision_module=None):
         self.thread_manager = thread_manager
+        # Describes snapshots when they can't be attached to the message
+        self.vision_module = vision_module
+        self.uploaded_files = []
         self.eleven_labs_manager = eleven_labs_manager
         self.assistant_id = assistant_id
         self.event_handler = None
+        self.tts_pipeline = tts_pipeline
+        # (thread_id, run_id) of the run being streamed, so it can be cancelled on barge-in
+        self.current_run = None
+        self.cancelled = False
+        self.stream_started = None
+
+    def prepare(self):
+        """
+        Gets a valid thread ready before the transcript arrives, so only the
+        message and run requests remain on the critical path. Retrieving or
+        creating the thread also warms the API connection.
+
+        Returns the seconds spent on work the turn would otherwise have
+        waited for (creating the thread).
+        """
+        saved = 0.0
+        thread_manager = self.thread_manager
+        if thread_manager.thread_id:
+            try:
+                thread_manager.client.beta.threads.retrieve(thread_manager.thread_id)
+            except Exception as e:
+                print(f"Thread {thread_manager.thread_id} is no longer usable: {e}")
+                thread_manager.reset_thread()
+        if not thread_manager.thread_id:
+            start = time.perf_counter()
+            thread_manager.create_thread()
+            saved = time.perf_counter() - start
+        # Keep the thread from being reset while the user is still speaking
+        thread_manager.reset_last_interaction_time()
+        return saved
+
+    def cancel(self):
+        """Stops the in-flight run, e.g. when the user interrupts the response."""
+        self.cancelled = True
+        if self.current_run is not None:
+            self.cancel_run(*self.current_run)
+
+    def cancel_run(self, thread_id, run_id):
+        try:
+            self.thread_manager.client.beta.threads.runs.cancel(run_id=run_id, thread_id=thread_id)
+            print(f"Run cancelled: {run_id}")
+        except Exception as e:
+            # The run may already have finished
+            print(f"Failed to cancel run {run_id}: {e}")
+
+    def cancelled_result(self):
+        self.current_run = None
+        self.thread_manager.interaction_in_progress = False
+        self.thread_manager.end_of_interaction()
+        return AssitsantResult(
+            response=self.text,
+            status=AssistantResultStatus.CANCELLED
+        )
+
+    def failed_result(self, error):
+        # A finished run can't be cancelled, so a later barge-in must not try
+        self.current_run = None
+        self.thread_manager.interaction_in_progress = False
+        self.thread_manager.end_of_interaction()
+        if self.tts_pipeline:
+            self.tts_pipeline.finish()
+        return AssitsantResult(
+            error=error,
+            status=AssistantResultStatus.ERROR
+        )
+
+    def message_content(self, content):
+        """Turns an ImagePrompt into multimodal message content, falling back to a description of the image."""
+        if not isinstance(content, ImagePrompt):
+            return content
+        try:
+            with tracer.span("image_upload", bytes=len(content.base64_image)):
+                uploaded = self.thread_manager.client.files.create(
+                    file=(f"snapshot.{content.mime_type.split('/')[-1]}", base64.b64decode(content.base64_image), content.mime_type),
+                    purpose="vision"
+                )
+        except Exception as e:
+            print(f"Failed to attach snapshot, describing it instead: {e}")
+            return self.describe_snapshot(content)
+        self.uploaded_files.append(uploaded.id)
+        return [
+            {"type": "text", "text": content.text},
+            {"type": "image_file", "image_file": {"file_id": uploaded.id, "detail": content.detail}}
+        ]
+
+    def describe_snapshot(self, prompt: ImagePrompt):
+        """Text-only stand-in for an ImagePrompt the assistant can't take as an image."""
+        if self.vision_module is None:
+            return prompt.text
+        return self.vision_module.get_image_description(prompt.text, prompt.base64_image)
+
+    def delete_uploaded_files(self):
+        files, self.uploaded_files = self.uploaded_files, []
+        for file_id in files:
+            try:
+                self.thread_manager.client.files.delete(file_id)
+            except Exception as e:
+                print(f"Failed to delete uploaded file {file_id}: {e}")
 
     def set_event_handler(self, event_handler):
         self.event_handler = event_handler
     
     def func_name_to_application_event(self, func):
-        if func.name == "send_text_message":
-            return ApplicationEventType.ZAPIER
-        elif func.name == "send_image_description":
-            return ApplicationEventType.GET_SNAPSHOT
-        else:
+        if func.name not in TOOL_EVENT_TYPES:
             raise NotImplementedError(f"{func.name=}")
+        return TOOL_EVENT_TYPES[func.name]
 
     def resolve_calls(self, event):
         data = event.data
@@ -155,7 +266,7 @@ class StreamingManager:
         raise NotImplementedError(f"{action.type=}")
     
     def submit_tool_calls_and_stream(self, result):
-        return openai.beta.threads.runs.submit_tool_outputs_stream(
+        return self.thread_manager.client.beta.threads.runs.submit_tool_outputs_stream(
             tool_outputs=[{
                 "output": call["output"],
                 "tool_call_id": call["tool_call_id"]
@@ -167,9 +278,23 @@ class StreamingManager:
     def handle_stream(self, streaming_manager):
         with streaming_manager as stream:
             for event in stream:
+                if isinstance(event, ThreadRunCreated):
+                    self.current_run = (event.data.thread_id, event.data.id)
+                    if self.cancelled:
+                        # Interrupted before the run id was known
+                        self.cancel_run(*self.current_run)
+                    continue
+                if self.cancelled:
+                    # Leaving the context closes the stream
+                    return self.cancelled_result()
                 if isinstance(event, ThreadMessageDelta) and event.data.delta.content:
+                    if self.stream_started is not None:
+                        tracer.record("first_delta", self.stream_started)
+                        self.stream_started = None
                     delta = event.data.delta.content[0].text.value
                     self.text +=  delta if delta is not None else ""
+                    if self.tts_pipeline and delta:
+                        self.tts_pipeline.feed(delta)
                     continue
                 if isinstance(event, ThreadRunRequiresAction):
                     print("ActionRequired")
@@ -179,23 +304,30 @@ class StreamingManager:
                     )
                 if isinstance(event, ThreadRunCompleted):
                     print("\nInteraction completed.")
+                    # A finished run can't be cancelled, so a later barge-in must not try
+                    self.current_run = None
                     self.thread_manager.interaction_in_progress = False
                     self.thread_manager.end_of_interaction()
+                    if self.tts_pipeline:
+                        self.tts_pipeline.finish()
                     return AssitsantResult(
                         response=self.text,
-                        status=AssistantResultStatus.SUCCESS
+                        status=AssistantResultStatus.SUCCESS,
+                        streamed=self.tts_pipeline is not None
                     )
                     # Exit the loop once the interaction is complete
                 if isinstance(event, ThreadRunFailed):
                     print("\nInteraction failed.")
-                    self.thread_manager.interaction_in_progress = False
-                    self.thread_manager.end_of_interaction()
-                    return AssitsantResult(
-                        error="Generic OpenAI Error",
-                        status=AssistantResultStatus.ERROR
-                    )
+                    return self.failed_result("Generic OpenAI Error")
                     # Exit the loop if the interaction fails
+                if isinstance(event, ThreadRunCancelled) and self.cancelled:
+                    return self.cancelled_result()
                 # Add more event types as needed based on your application's requirements
+        if self.cancelled:
+            return self.cancelled_result()
+        # E.g. an expired or incomplete run, or one cancelled elsewhere
+        print("\nInteraction ended without completing.")
+        return self.failed_result("Run ended without completing")
 
     def handle_streaming_interaction(self, event: ApplicationEvent):
         if not self.assistant_id:
@@ -205,17 +337,30 @@ class StreamingManager:
             self.thread_manager.create_thread()
         
         content = event.request
+        self.cancelled = False
+        # Cleared once the first text delta arrives
+        self.stream_started = time.perf_counter()
         if event.type == ApplicationEventType.AI_INTERACT:
             self.text = ""
-            self.thread_manager.add_message_to_thread(content)
-            manager = openai.beta.threads.runs.create_and_stream(
+            if self.tts_pipeline:
+                self.tts_pipeline.start()
+            added = self.thread_manager.add_message_to_thread(self.message_content(content))
+            if not added and isinstance(content, ImagePrompt):
+                # E.g. the assistant's model takes no images; the run must still get the question
+                print("Image message rejected, describing the snapshot instead")
+                self.thread_manager.add_message_to_thread(self.describe_snapshot(content))
+            manager = self.thread_manager.client.beta.threads.runs.create_and_stream(
                 thread_id=self.thread_manager.thread_id,
                 assistant_id=self.assistant_id,
             )
         elif event.type == ApplicationEventType.AI_TOOL_RETURN:
+            self.current_run = (event.request["thread_id"], event.request["run_id"])
             manager = self.submit_tool_calls_and_stream(event.request)
         
         result = self.handle_stream(manager)
+        if self.uploaded_files and result.status != AssistantResultStatus.ACTION_REQUIED:
+            # The run has seen the snapshot, it doesn't need to be kept around
+            threading.Thread(target=self.delete_uploaded_files, daemon=True).start()
         if result.status == AssistantResultStatus.ERROR:
             event.status = ProcessingStatus.ERROR
             event.error = result.error
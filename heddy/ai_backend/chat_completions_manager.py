@@ -0,0 +1,211 @@
+import threading
+import time
+
+from heddy.application_event import ApplicationEvent, ApplicationEventType, ProcessingStatus
+from heddy.ai_backend.assistant_manager import AssistantResultStatus, AssitsantResult
+from heddy.ai_backend.conversation_store import ConversationStore
+from heddy.functions2call import TOOLS, TOOL_EVENT_TYPES
+from heddy.tracing import tracer
+from heddy.vision_module import ImagePrompt
+
+DEFAULT_SYSTEM_PROMPT = (
+    "You are Heddy, a helpful voice assistant. Your answers are read aloud, "
+    "so keep them short and conversational and avoid markdown."
+)
+
+SUMMARY_PROMPT = (
+    "Summarize the conversation below in a few sentences for your own memory. "
+    "Keep names, facts, requests and decisions; drop small talk."
+)
+
+
+class ChatCompletionsManager:
+    """
+    Assistant backend that streams chat completions with locally kept history.
+
+    Each turn is a single streaming request (the Assistants API needs a
+    message create and a run create per turn, plus a thread create). Results
+    have the same shape as StreamingManager's, so the controller, the tool
+    executor and the streaming TTS pipeline work unchanged.
+    """
+
+    # Snapshots are sent inline as image parts of the user message
+    supports_images = True
+
+    def __init__(self, client, model="gpt-4o-mini", store=None, tts_pipeline=None, summary_model=None, vision_module=None):
+        self.client = client
+        # Describes snapshots if the model rejects the image
+        self.vision_module = vision_module
+        self.model = model
+        self.summary_model = summary_model or model
+        self.store = store or ConversationStore(DEFAULT_SYSTEM_PROMPT)
+        if self.store.summarizer is None:
+            self.store.summarizer = self.summarize
+        self.tts_pipeline = tts_pipeline
+        self.text = ""
+        self.stream = None
+        self.cancelled = False
+        self.stream_started = None
+
+    def prepare(self):
+        """
+        Warms the API connection while the user is still speaking.
+
+        The history is already local, so no request is taken off the
+        critical path and 0 seconds are reported as saved.
+        """
+        self.client.models.list()
+        return 0.0
+
+    def cancel(self):
+        """Stops the in-flight response, e.g. when the user interrupts it."""
+        self.cancelled = True
+        stream = self.stream
+        if stream is not None:
+            try:
+                stream.close()
+            except Exception as e:
+                print(f"Failed to close completion stream: {e}")
+
+    def summarize(self, previous_summary, messages):
+        transcript = "\n".join(
+            f"{message['role']}: {message.get('content') or ''}" for message in messages if message.get("content")
+        )
+        if previous_summary:
+            transcript = f"Earlier summary: {previous_summary}\n{transcript}"
+        response = self.client.chat.completions.create(
+            model=self.summary_model,
+            messages=[
+                {"role": "system", "content": SUMMARY_PROMPT},
+                {"role": "user", "content": transcript}
+            ],
+            max_tokens=200
+        )
+        return response.choices[0].message.content
+
+    def compact_in_background(self):
+        threading.Thread(target=self.store.compact, daemon=True).start()
+
+    def message_content(self, content):
+        if not isinstance(content, ImagePrompt):
+            return content
+        return [
+            {"type": "text", "text": content.text},
+            {"type": "image_url", "image_url": {"url": content.data_url, "detail": content.detail}}
+        ]
+
+    def create_stream(self):
+        return self.client.chat.completions.create(
+            model=self.model,
+            messages=self.store.messages(),
+            tools=TOOLS,
+            stream=True
+        )
+
+    def resolve_calls(self, tool_calls):
+        return {
+            "tools": [{
+                "type": TOOL_EVENT_TYPES[call["function"]["name"]],
+                "args": call["function"]["arguments"],
+                "tool_call_id": call["id"]
+            } for call in tool_calls],
+            "run_id": None,
+            "thread_id": None
+        }
+
+    def handle_stream(self, stream):
+        """Reads a completion stream, feeding text to the TTS pipeline and collecting tool calls."""
+        tool_calls = {}
+        text = ""
+        try:
+            for chunk in stream:
+                if self.cancelled:
+                    break
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                if delta.content:
+                    if self.stream_started is not None:
+                        tracer.record("first_delta", self.stream_started)
+                        self.stream_started = None
+                    text += delta.content
+                    if self.tts_pipeline:
+                        self.tts_pipeline.feed(delta.content)
+                # Tool calls arrive in fragments, keyed by their index
+                for fragment in delta.tool_calls or []:
+                    call = tool_calls.setdefault(fragment.index, {
+                        "id": "",
+                        "type": "function",
+                        "function": {"name": "", "arguments": ""}
+                    })
+                    if fragment.id:
+                        call["id"] = fragment.id
+                    if fragment.function and fragment.function.name:
+                        call["function"]["name"] += fragment.function.name
+                    if fragment.function and fragment.function.arguments:
+                        call["function"]["arguments"] += fragment.function.arguments
+        except Exception as e:
+            if not self.cancelled:
+                if self.tts_pipeline:
+                    self.tts_pipeline.finish()
+                return AssitsantResult(error=str(e), status=AssistantResultStatus.ERROR)
+        finally:
+            self.stream = None
+        self.text += text
+
+        if self.cancelled:
+            if text:
+                self.store.add_assistant_message(text)
+            return AssitsantResult(response=self.text, status=AssistantResultStatus.CANCELLED)
+        calls = [tool_calls[index] for index in sorted(tool_calls)]
+        self.store.add_assistant_message(text, tool_calls=calls)
+        if calls:
+            print("ActionRequired")
+            return AssitsantResult(calls=self.resolve_calls(calls), status=AssistantResultStatus.ACTION_REQUIED)
+        print("\nInteraction completed.")
+        if self.tts_pipeline:
+            self.tts_pipeline.finish()
+        self.store.drop_images()
+        self.compact_in_background()
+        return AssitsantResult(
+            response=self.text,
+            status=AssistantResultStatus.SUCCESS,
+            streamed=self.tts_pipeline is not None
+        )
+
+    def handle_streaming_interaction(self, event: ApplicationEvent):
+        self.cancelled = False
+        self.stream_started = time.perf_counter()
+        if event.type == ApplicationEventType.AI_INTERACT:
+            self.text = ""
+            if self.tts_pipeline:
+                self.tts_pipeline.start()
+            self.store.add_user_message(self.message_content(event.request))
+        elif event.type == ApplicationEventType.AI_TOOL_RETURN:
+            for call in event.request["tools"]:
+                self.store.add_tool_result(call["tool_call_id"], call["output"])
+
+        try:
+            try:
+                self.stream = self.create_stream()
+            except Exception as e:
+                if not (isinstance(event.request, ImagePrompt) and self.vision_module):
+                    raise
+                print(f"Image input failed, describing the snapshot instead: {e}")
+                prompt = event.request
+                self.store.replace_last_user_message(self.vision_module.get_image_description(prompt.text, prompt.base64_image))
+                self.stream = self.create_stream()
+        except Exception as e:
+            if self.tts_pipeline:
+                self.tts_pipeline.finish()
+            result = AssitsantResult(error=str(e), status=AssistantResultStatus.ERROR)
+        else:
+            result = self.handle_stream(self.stream)
+
+        if result.status == AssistantResultStatus.ERROR:
+            event.status = ProcessingStatus.ERROR
+            event.error = result.error
+        else:
+            event.status = ProcessingStatus.SUCCESS
+            event.result = result
+        return event
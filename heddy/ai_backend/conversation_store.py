@@ -0,0 +1,129 @@
+import threading
+
+# Rough token estimate; good enough for budgeting without a tokenizer dependency
+CHARS_PER_TOKEN = 4
+# Cost of one low-detail image part
+IMAGE_TOKENS = 85
+
+
+def estimate_tokens(message):
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        images = sum(1 for part in content if part.get("type") == "image_url")
+        text = "".join(part.get("text", "") for part in content)
+        return 4 + images * IMAGE_TOKENS + len(text) // CHARS_PER_TOKEN
+    tool_calls = message.get("tool_calls") or []
+    arguments = sum(len(call["function"]["arguments"]) + len(call["function"]["name"]) for call in tool_calls)
+    # A few tokens of per-message overhead for role and separators
+    return 4 + (len(content) + arguments) // CHARS_PER_TOKEN
+
+
+class ConversationStore:
+    """
+    Conversation history kept locally for the chat completions backend.
+
+    Messages are grouped into turns (a user message and everything that
+    follows it). Once the history grows past max_tokens, the oldest turns
+    beyond the keep_recent_turns most recent ones are folded into a running
+    summary by the summarizer callable (or dropped if there is none).
+    compact() is meant to run between turns, off the latency critical path.
+    """
+
+    def __init__(self, system_prompt, max_tokens=3000, keep_recent_turns=4, summarizer=None):
+        self.system_prompt = system_prompt
+        self.max_tokens = max_tokens
+        self.keep_recent_turns = keep_recent_turns
+        self.summarizer = summarizer
+        self.summary = ""
+        self.turns = []
+        self.lock = threading.Lock()
+        self.compact_lock = threading.Lock()
+
+    def add_user_message(self, content):
+        with self.lock:
+            self.turns.append([{"role": "user", "content": content}])
+
+    def add_assistant_message(self, content, tool_calls=None):
+        message = {"role": "assistant", "content": content or None}
+        if tool_calls:
+            message["tool_calls"] = tool_calls
+        self._append(message)
+
+    def add_tool_result(self, tool_call_id, output):
+        self._append({"role": "tool", "tool_call_id": tool_call_id, "content": str(output)})
+
+    def _append(self, message):
+        with self.lock:
+            if not self.turns:
+                self.turns.append([])
+            self.turns[-1].append(message)
+
+    def messages(self):
+        """Returns the messages to send with the next request: system prompt, summary and recent turns."""
+        with self.lock:
+            system = self.system_prompt
+            if self.summary:
+                system += f"\n\nSummary of the earlier conversation:\n{self.summary}"
+            return [{"role": "system", "content": system}] + [message for turn in self.turns for message in turn]
+
+    def drop_images(self):
+        """Replaces image parts in the history with a placeholder, so they are only sent on their own turn."""
+        with self.lock:
+            for turn in self.turns:
+                for message in turn:
+                    if isinstance(message.get("content"), list):
+                        message["content"] = " ".join(
+                            part["text"] if part.get("type") == "text" else "[snapshot]" for part in message["content"]
+                        )
+
+    def replace_last_user_message(self, content):
+        with self.lock:
+            for turn in reversed(self.turns):
+                if turn and turn[0]["role"] == "user":
+                    turn[0]["content"] = content
+                    return
+
+    def token_count(self):
+        return sum(estimate_tokens(message) for message in self.messages())
+
+    def compact(self):
+        """Summarizes or drops the oldest turns until the history fits into max_tokens."""
+        # Only one compaction at a time, a concurrent call has nothing left to do
+        if not self.compact_lock.acquire(blocking=False):
+            return
+        try:
+            self._compact()
+        finally:
+            self.compact_lock.release()
+
+    def _compact(self):
+        with self.lock:
+            candidates = len(self.turns) - self.keep_recent_turns
+            tokens = self._tokens()
+            count = 0
+            while count < candidates and tokens > self.max_tokens:
+                tokens -= sum(estimate_tokens(message) for message in self.turns[count])
+                count += 1
+            old_messages = [message for turn in self.turns[:count] for message in turn]
+            summary = self.summary
+        if not count:
+            return
+        # The old turns stay in the history until their summary is ready
+        if self.summarizer:
+            try:
+                summary = self.summarizer(summary, old_messages)
+            except Exception as e:
+                print(f"Failed to summarize conversation history: {e}")
+        with self.lock:
+            del self.turns[:count]
+            self.summary = summary
+
+    def _tokens(self):
+        return estimate_tokens({"content": self.system_prompt + self.summary}) + sum(
+            estimate_tokens(message) for turn in self.turns for message in turn
+        )
+
+    def clear(self):
+        with self.lock:
+            self.turns = []
+            self.summary = ""
@@ -0,0 +1,64 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from heddy.application_event import ApplicationEvent, ProcessingStatus
+from heddy.tracing import tracer
+
+
+class ToolCallExecutor:
+    """
+    Runs the tool calls of a single assistant run concurrently.
+
+    Each call is dispatched to a bounded thread pool and given its own
+    timeout, measured from the moment the batch was submitted. Outputs (or
+    error descriptions) are written back into the tool call dicts so they
+    can be submitted to the assistant in one go.
+    """
+
+    def __init__(self, handler, max_workers=4, timeout=30.0, timeouts=None):
+        self.handler = handler
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool-call")
+        self.timeout = timeout
+        # Per-tool overrides, keyed by ApplicationEventType
+        self.timeouts = timeouts or {}
+
+    def timeout_for(self, tool_type):
+        return self.timeouts.get(tool_type, self.timeout)
+
+    def _run(self, tool_call):
+        start = time.perf_counter()
+        event = self.handler(ApplicationEvent(
+            type=tool_call["type"],
+            request=tool_call["args"]
+        ))
+        return event, time.perf_counter() - start
+
+    def run_all(self, tool_calls):
+        """
+        Execute all tool calls and fill in their "output" field.
+
+        Args:
+        tool_calls (list): Tool call dicts as produced by StreamingManager.resolve_calls.
+        """
+        submitted_at = time.perf_counter()
+        futures = [(call, self.executor.submit(self._run, call)) for call in tool_calls]
+        for call, future in futures:
+            timeout = self.timeout_for(call["type"])
+            remaining = max(0.0, submitted_at + timeout - time.perf_counter())
+            try:
+                event, latency = future.result(timeout=remaining)
+            except TimeoutError:
+                # The worker keeps running, but the assistant gets an answer in time
+                latency = time.perf_counter() - submitted_at
+                call["output"] = f"Tool call timed out after {timeout:.1f} seconds."
+            except Exception as e:
+                latency = time.perf_counter() - submitted_at
+                call["output"] = f"Tool call failed: {e}"
+            else:
+                if event.status == ProcessingStatus.ERROR:
+                    call["output"] = f"Tool call failed: {event.error}"
+                else:
+                    call["output"] = event.result
+            tracer.record(f"tool:{call['type'].name}", submitted_at, submitted_at + latency)
+            print(f"Tool call {call['type'].name} finished in {latency:.3f}s")
+        return tool_calls
@@ -1,8 +1,8 @@
 from heddy.application_event import ApplicationEvent, ProcessingStatus
 import json
-import requests
+from heddy.http_session import http_sessions
 
-def tool_call_zapier(arguments):
+def tool_call_zapier(arguments, session=None):
     webhook_url = "https://hooks.zapier.com/hooks/catch/82343/19816978ac224264aa3eec6c8c911e10/"
     
     # Parse the arguments as JSON if it's a string
@@ -13,16 +13,20 @@ def tool_call_zapier(arguments):
     text_to_send = arguments.get('message', '')  # Default to empty string if 'message' not found
     
     payload = {"text": text_to_send}
-    response = requests.post(webhook_url, json=payload)
+    session = session or http_sessions.session
+    response = session.post(webhook_url, json=payload)
     if response.status_code == 200:
         return "Success!"
     else:
         raise RuntimeError(f"Failed with {response.status_code=}")
     
 class ZapierManager:
+    def __init__(self, session=None):
+        self.session = session
+
     def handle_message(self, event: ApplicationEvent):
         try:
-            event.result = tool_call_zapier(event.request)
+            event.result = tool_call_zapier(event.request, session=self.session)
             event.status = ProcessingStatus.SUCCESS
         except Exception as e:
             event.error = str(e)
@@ -17,6 +17,7 @@ class ApplicationEventType(Enum):
     AI_INTERACT = 9
     AI_TOOL_RETURN = 10
     ZAPIER = 11
+    PLAY_STREAM = 12
 
 class ProcessingStatus(Enum):
     INIT = 0
@@ -0,0 +1,40 @@
+from heddy.application_event import ApplicationEventType
+
+# Tool definitions in the chat completions format, mirroring the functions
+# configured on the hosted assistant
+TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "send_text_message",
+            "description": "Send a text message to the user's phone via Zapier.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "message": {"type": "string", "description": "The text of the message to send."}
+                },
+                "required": ["message"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "send_image_description",
+            "description": "Take a picture with the camera and describe what is in view.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "prompt": {"type": "string", "description": "What to look for or describe in the picture."}
+                },
+                "required": ["prompt"]
+            }
+        }
+    },
+]
+
+# Which application event handles each tool
+TOOL_EVENT_TYPES = {
+    "send_text_message": ApplicationEventType.ZAPIER,
+    "send_image_description": ApplicationEventType.GET_SNAPSHOT,
+}
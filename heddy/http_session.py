@@ -0,0 +1,88 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Hosts every interaction talks to, used to open connections ahead of the first turn
+DEFAULT_PREWARM_URLS = [
+    "https://api.openai.com/v1",
+    "https://api.elevenlabs.io/v1",
+    "https://hooks.zapier.com",
+]
+
+class HTTPSessionManager:
+    """
+    Owns the keep-alive HTTP session shared by all outbound API clients.
+
+    Reusing one session keeps DNS, TCP and TLS setup off the per-turn path.
+    Retries with exponential backoff cover connection errors for every
+    method and transient status codes for idempotent requests, so webhook
+    POSTs are never sent twice.
+    """
+
+    def __init__(self, pool_connections=4, pool_maxsize=8, retries=3, backoff_factor=0.3):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self._session = None
+        self._lock = threading.Lock()
+
+    def configure(self, **kwargs):
+        """Update pool settings; the session is rebuilt on next use."""
+        for key, value in kwargs.items():
+            if not hasattr(self, key):
+                raise TypeError(f"Unknown session option: {key}")
+            setattr(self, key, value)
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+            self._session = None
+
+    def _build_session(self):
+        retry = Retry(
+            total=self.retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=retry,
+        )
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    @property
+    def session(self) -> requests.Session:
+        with self._lock:
+            if self._session is None:
+                self._session = self._build_session()
+            return self._session
+
+    def prewarm(self, urls=None, timeout=5.0):
+        """
+        Open connections to the given hosts in the background.
+
+        Args:
+        urls (list): URLs to send a HEAD request to. Defaults to the API hosts used by heddy.
+        timeout (float): Timeout for each warm-up request in seconds.
+        """
+        def warm(url):
+            try:
+                self.session.head(url, timeout=timeout)
+            except requests.RequestException as e:
+                print(f"Failed to pre-warm connection to {url}: {e}")
+
+        threads = [
+            threading.Thread(target=warm, args=(url,), daemon=True)
+            for url in (urls or DEFAULT_PREWARM_URLS)
+        ]
+        for thread in threads:
+            thread.start()
+        return threads
+
+# Global instance to be used by all API clients
+http_sessions = HTTPSessionManager()
@@ -0,0 +1,90 @@
+import io
+from dataclasses import dataclass
+
+from PIL import Image
+
+MIME_TYPES = {
+    "jpeg": "image/jpeg",
+    "webp": "image/webp",
+    "png": "image/png",
+}
+
+
+@dataclass
+class ImageSettings:
+    """How camera frames are prepared for the vision API."""
+    # Longest side in pixels; low detail images are scaled to 512x512 by the API anyway
+    max_size: int = 768
+    format: str = "jpeg"
+    quality: int = 80
+    # Detail hint sent with the image: low, high or auto
+    detail: str = "low"
+
+    def __post_init__(self):
+        if self.format not in MIME_TYPES:
+            raise ValueError(f"Unsupported image format: {self.format}")
+        if self.detail not in ("low", "high", "auto"):
+            raise ValueError(f"Unsupported image detail: {self.detail}")
+
+    @property
+    def mime_type(self):
+        return MIME_TYPES[self.format]
+
+    @property
+    def label(self):
+        return f"{self.format}-{self.max_size}px-q{self.quality}-{self.detail}"
+
+
+def preprocess_image(data, settings: ImageSettings):
+    """
+    Downsamples and re-encodes an image entirely in memory.
+
+    Args:
+    data (bytes or PIL.Image.Image): The encoded camera frame (PNG, JPEG, ...) or an already decoded one.
+    settings (ImageSettings): Target size, format and quality.
+    """
+    if isinstance(data, Image.Image):
+        image = data
+    else:
+        image = Image.open(io.BytesIO(data))
+        # Lets the JPEG decoder scale down while decoding, which is much cheaper
+        image.draft("RGB", (settings.max_size, settings.max_size))
+    image = image.convert("RGB")
+    image.thumbnail((settings.max_size, settings.max_size), Image.BILINEAR)
+    output = io.BytesIO()
+    if settings.format == "png":
+        image.save(output, format="PNG", optimize=False)
+    else:
+        image.save(output, format=settings.format.upper(), quality=settings.quality)
+    return output.getvalue()
+
+
+def difference_hash(data, hash_size=16):
+    """
+    Perceptual hash of an image: one bit per horizontally adjacent pixel pair of a tiny grayscale copy.
+
+    Similar scenes get hashes that differ in few bits, so the Hamming
+    distance between two hashes measures how much the scene changed, while
+    sensor noise and recompression barely affect it.
+
+    Args:
+    data (bytes or PIL.Image.Image): The image, encoded or decoded.
+    hash_size (int): Bits per row and rows; the hash has hash_size ** 2 bits.
+    """
+    if isinstance(data, Image.Image):
+        image = data
+    else:
+        image = Image.open(io.BytesIO(data))
+        image.draft("L", (hash_size * 8, hash_size * 8))
+    pixels = list(image.convert("L").resize((hash_size + 1, hash_size), Image.BILINEAR).getdata())
+    value = 0
+    for row in range(hash_size):
+        for column in range(hash_size):
+            left = pixels[row * (hash_size + 1) + column]
+            value = (value << 1) | (left > pixels[row * (hash_size + 1) + column + 1])
+    return value
+
+
+def hash_distance(first, second):
+    """Number of differing bits between two difference hashes."""
+    return bin(first ^ second).count("1")
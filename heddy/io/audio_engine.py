@@ -0,0 +1,114 @@
+import threading
+from collections import deque
+
+import pyaudio
+
+from heddy.io.audio_recorder import FRAMES_PER_BUFFER, SAMPLE_RATE, SuppressStderr
+
+
+class RingBuffer:
+    """Bounded queue of captured audio chunks for one consumer; the oldest chunks are dropped when it is full."""
+
+    def __init__(self, max_chunks=256):
+        self.chunks = deque(maxlen=max_chunks)
+        self.condition = threading.Condition()
+
+    def put(self, chunk):
+        with self.condition:
+            self.chunks.append(chunk)
+            self.condition.notify()
+
+    def get(self, timeout=None):
+        """Returns the next chunk, or None if nothing arrived within the timeout."""
+        with self.condition:
+            if not self.chunks:
+                self.condition.wait(timeout)
+            if not self.chunks:
+                return None
+            return self.chunks.popleft()
+
+    def clear(self):
+        with self.condition:
+            self.chunks.clear()
+
+
+class AudioEngine:
+    """
+    Owns the audio device for the whole application.
+
+    The microphone is opened once and every captured chunk is fanned out to
+    the ring buffers of all subscribers (keyword spotter, recorder), so
+    nothing has to open the input device per interaction or compete for it.
+    Output streams are likewise opened once per format and kept alive.
+    """
+
+    def __init__(self, sample_rate=SAMPLE_RATE, frames_per_buffer=FRAMES_PER_BUFFER):
+        self.sample_rate = sample_rate
+        self.frames_per_buffer = frames_per_buffer
+        # Suppress ALSA warnings during PyAudio initialization
+        with SuppressStderr():
+            self.pyaudio_instance = pyaudio.PyAudio()
+        self.input_stream = None
+        self.output_streams = {}
+        self.subscribers = []
+        self.lock = threading.Lock()
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        """Opens the input device and starts distributing captured audio."""
+        if self.running:
+            return
+        with SuppressStderr():
+            self.input_stream = self.pyaudio_instance.open(format=pyaudio.paInt16,
+                                                           channels=1,
+                                                           rate=self.sample_rate,
+                                                           input=True,
+                                                           frames_per_buffer=self.frames_per_buffer)
+        self.running = True
+        self.thread = threading.Thread(target=self._capture, daemon=True)
+        self.thread.start()
+
+    def _capture(self):
+        while self.running:
+            data = self.input_stream.read(self.frames_per_buffer, exception_on_overflow=False)
+            with self.lock:
+                subscribers = list(self.subscribers)
+            for subscriber in subscribers:
+                subscriber.put(data)
+
+    def subscribe(self, max_chunks=256) -> RingBuffer:
+        """Returns a ring buffer that receives every chunk captured from now on."""
+        buffer = RingBuffer(max_chunks)
+        with self.lock:
+            self.subscribers.append(buffer)
+        return buffer
+
+    def unsubscribe(self, buffer: RingBuffer):
+        with self.lock:
+            if buffer in self.subscribers:
+                self.subscribers.remove(buffer)
+
+    def get_output_stream(self, sample_rate, channels=1, sample_width=2):
+        """Returns a persistent output stream for the given PCM format, opening it on first use."""
+        key = (sample_rate, channels, sample_width)
+        with self.lock:
+            if key not in self.output_streams:
+                self.output_streams[key] = self.pyaudio_instance.open(
+                    format=self.pyaudio_instance.get_format_from_width(sample_width),
+                    channels=channels,
+                    rate=sample_rate,
+                    output=True
+                )
+            return self.output_streams[key]
+
+    def close(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+        if self.input_stream is not None:
+            self.input_stream.stop_stream()
+            self.input_stream.close()
+        for stream in self.output_streams.values():
+            stream.close()
+        self.pyaudio_instance.terminate()
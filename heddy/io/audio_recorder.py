@@ -4,6 +4,12 @@ import pyaudio
 import wave
 import threading
 
+from heddy.io.recorded_audio import RecordedAudio, frame_rms
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+FRAMES_PER_BUFFER = 1024
+
 # Context manager to suppress stderr
 class SuppressStderr:
     def __enter__(self):
@@ -14,14 +20,117 @@ class SuppressStderr:
         sys.stderr.close()
         sys.stderr = self.original_stderr
 
+class VoiceActivityDetector:
+    """
+    Energy-based voice activity detection for 16-bit PCM chunks.
+
+    A chunk counts as speech when its RMS level is above both the fixed
+    threshold and ratio times the running noise floor, which is estimated
+    from chunks classified as silence.
+    """
+    def __init__(self, threshold=500, ratio=3.0, noise_smoothing=0.95):
+        self.threshold = threshold
+        self.ratio = ratio
+        self.noise_smoothing = noise_smoothing
+        self.noise_floor = None
+
+    def is_speech(self, chunk):
+        level = frame_rms(chunk)
+        noise_floor = self.noise_floor if self.noise_floor is not None else 0.0
+        speech = level >= max(self.threshold, noise_floor * self.ratio)
+        if not speech:
+            self.noise_floor = (
+                self.noise_smoothing * noise_floor + (1 - self.noise_smoothing) * level
+            )
+        return speech
+
 class AudioRecorder:
-    def __init__(self, output_filename="recorded_audio.wav"):
+    def __init__(
+            self,
+            output_filename=None,
+            preallocate_seconds=30,
+            vad=None,
+            trim_padding_ms=200,
+            auto_stop_ms=0,
+            on_auto_stop=None,
+            engine=None
+        ):
+        # When set, every recording is also saved as a WAV file (useful for debugging)
         self.output_filename = output_filename
+        self.preallocate_bytes = preallocate_seconds * SAMPLE_RATE * SAMPLE_WIDTH
         self.is_recording = False
-        self.frames = []
+        self.buffer = bytearray()
+        self.length = 0
         self.thread = None
         self.pyaudio_instance = None
         self.stream = None
+        # With a shared AudioEngine, frames come from its ring buffer instead of opening the device
+        self.engine = engine
+        self.engine_buffer = None
+        # Callables receiving every captured chunk, e.g. a streaming transcription
+        self.listeners = []
+        # With a VAD, leading/trailing silence is trimmed from get_audio() and
+        # on_auto_stop is called once after auto_stop_ms of silence following speech
+        self.vad = vad
+        self.trim_padding_bytes = trim_padding_ms * SAMPLE_RATE * SAMPLE_WIDTH // 1000
+        self.auto_stop_bytes = auto_stop_ms * SAMPLE_RATE * SAMPLE_WIDTH // 1000
+        self.on_auto_stop = on_auto_stop
+        self._reset_speech_state()
+
+    def _reset_speech_state(self):
+        self.speech_start = None
+        self.speech_end = None
+        self.auto_stopped = False
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def _append(self, data):
+        """Copies captured frames into the preallocated buffer, doubling it when full."""
+        end = self.length + len(data)
+        if end > len(self.buffer):
+            self.buffer.extend(bytearray(max(len(self.buffer), len(data))))
+        self.buffer[self.length:end] = data
+        self.length = end
+
+    def _process_chunk(self, data):
+        self._append(data)
+        for listener in self.listeners:
+            listener(data)
+        if self.vad is None:
+            return
+        if self.vad.is_speech(data):
+            if self.speech_start is None:
+                self.speech_start = self.length - len(data)
+            self.speech_end = self.length
+        elif (
+            self.speech_end is not None
+            and self.auto_stop_bytes
+            and not self.auto_stopped
+            and self.length - self.speech_end >= self.auto_stop_bytes
+        ):
+            self.auto_stopped = True
+            print("Silence detected, ending recording.")
+            if self.on_auto_stop:
+                self.on_auto_stop()
+
+    def _record_from_engine(self):
+        """Consumes frames captured by the shared AudioEngine until recording stops."""
+        try:
+            while self.is_recording:
+                data = self.engine_buffer.get(timeout=0.1)
+                if data is not None:
+                    self._process_chunk(data)
+        finally:
+            self.engine.unsubscribe(self.engine_buffer)
+            self.engine_buffer = None
+
+        if self.output_filename:
+            self.save_wav(self.output_filename)
 
     def _record_audio(self):
         """Internal method to handle the audio recording."""
@@ -30,31 +139,61 @@ class AudioRecorder:
             self.pyaudio_instance = pyaudio.PyAudio()
             self.stream = self.pyaudio_instance.open(format=pyaudio.paInt16,
                                                      channels=1,
-                                                     rate=16000,
+                                                     rate=SAMPLE_RATE,
                                                      input=True,
-                                                     frames_per_buffer=1024)
+                                                     frames_per_buffer=FRAMES_PER_BUFFER)
         while self.is_recording:
-            data = self.stream.read(1024, exception_on_overflow=False)
-            self.frames.append(data)
+            data = self.stream.read(FRAMES_PER_BUFFER, exception_on_overflow=False)
+            self._process_chunk(data)
 
         # Stop and close the stream properly
         self.stream.stop_stream()
         self.stream.close()
         self.pyaudio_instance.terminate()
 
-        # Save the recording to a WAV file
-        with wave.open(self.output_filename, 'wb') as wf:
+        if self.output_filename:
+            self.save_wav(self.output_filename)
+
+    def speech_bounds(self):
+        """Byte range of the last recording that contains speech, padded on both sides."""
+        if self.vad is None or self.speech_start is None:
+            return 0, self.length
+        start = max(0, self.speech_start - self.trim_padding_bytes)
+        end = min(self.length, self.speech_end + self.trim_padding_bytes)
+        # Keep whole samples
+        return start - start % SAMPLE_WIDTH, end - end % SAMPLE_WIDTH
+
+    def get_audio(self) -> RecordedAudio:
+        """Returns the last recording, with silence trimmed when a VAD is set, without copying it."""
+        start, end = self.speech_bounds()
+        return RecordedAudio(
+            pcm=memoryview(self.buffer)[start:end],
+            sample_rate=SAMPLE_RATE,
+            sample_width=SAMPLE_WIDTH
+        )
+
+    def save_wav(self, file_path):
+        """Saves the last recording to a WAV file."""
+        with wave.open(file_path, 'wb') as wf:
             wf.setnchannels(1)
-            wf.setsampwidth(self.pyaudio_instance.get_sample_size(pyaudio.paInt16))
-            wf.setframerate(16000)
-            wf.writeframes(b''.join(self.frames))
+            wf.setsampwidth(SAMPLE_WIDTH)
+            wf.setframerate(SAMPLE_RATE)
+            wf.writeframes(memoryview(self.buffer)[:self.length])
 
     def start_recording(self):
         """Starts the audio recording."""
         if not self.is_recording:
             self.is_recording = True
-            self.frames = []
-            self.thread = threading.Thread(target=self._record_audio)
+            # A fresh buffer per recording, so audio handed out by get_audio stays valid
+            self.buffer = bytearray(self.preallocate_bytes)
+            self.length = 0
+            self._reset_speech_state()
+            if self.engine is not None:
+                # Subscribe right away so no frames are lost while the thread starts
+                self.engine_buffer = self.engine.subscribe()
+                self.thread = threading.Thread(target=self._record_from_engine)
+            else:
+                self.thread = threading.Thread(target=self._record_audio)
             self.thread.start()
             print("Recording started...")
 
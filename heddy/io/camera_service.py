@@ -0,0 +1,177 @@
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+import numpy as np
+from PIL import Image
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".bmp")
+
+
+@dataclass
+class CameraFrame:
+    """A captured frame as delivered by OpenCV: a BGR array of shape (height, width, 3)."""
+    pixels: np.ndarray = field(repr=False)
+    timestamp: float
+    index: int
+
+    def to_image(self):
+        return Image.fromarray(np.ascontiguousarray(self.pixels[:, :, ::-1]))
+
+
+class FrameRingBuffer:
+    """Keeps the most recent frames; the oldest ones are dropped when it is full."""
+
+    def __init__(self, max_frames=4):
+        self.frames = deque(maxlen=max_frames)
+        self.condition = threading.Condition()
+
+    def put(self, frame: CameraFrame):
+        with self.condition:
+            self.frames.append(frame)
+            self.condition.notify_all()
+
+    def latest(self, max_age=None, timeout=None, clock=time.monotonic):
+        """
+        Returns the newest frame, or None if there is no fresh enough one within the timeout.
+
+        Args:
+        max_age (float): Wait for a newer frame if the newest one is older than this many seconds.
+        timeout (float): Seconds to wait for a (fresh enough) frame.
+        """
+        with self.condition:
+            fresh = self.condition.wait_for(
+                lambda: self.frames and (max_age is None or clock() - self.frames[-1].timestamp <= max_age),
+                timeout
+            )
+            return self.frames[-1] if fresh else None
+
+    def __len__(self):
+        with self.condition:
+            return len(self.frames)
+
+
+class FileCameraDevice:
+    """
+    Fake camera with the cv2.VideoCapture interface the service uses.
+
+    Plays back an image file, or the images of a directory in name order
+    (looping), at the given frame rate, so the camera service and the
+    vision path can be tested without a camera.
+    """
+
+    def __init__(self, path, fps=15):
+        if os.path.isdir(path):
+            paths = sorted(
+                os.path.join(path, name) for name in os.listdir(path) if name.lower().endswith(IMAGE_EXTENSIONS)
+            )
+        else:
+            paths = [path]
+        # Decoded up front, like frames coming off a real sensor
+        self.frames = [np.asarray(Image.open(image_path).convert("RGB"))[:, :, ::-1] for image_path in paths]
+        self.interval = 1.0 / fps if fps else 0.0
+        self.position = 0
+        self.next_frame_at = time.monotonic()
+        self.opened = bool(self.frames)
+
+    def isOpened(self):
+        return self.opened
+
+    def set(self, prop, value):
+        return False
+
+    def read(self):
+        if not self.opened:
+            return False, None
+        # Block like a real device does until the next frame is due
+        delay = self.next_frame_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        self.next_frame_at = max(self.next_frame_at + self.interval, time.monotonic())
+        frame = self.frames[self.position % len(self.frames)]
+        self.position += 1
+        return True, frame
+
+    def release(self):
+        self.opened = False
+
+
+def open_camera(device, width, height, fps):
+    """Opens a V4L2 device with OpenCV, or a FileCameraDevice if device is an image file or directory."""
+    if not device.startswith("/dev/") and os.path.exists(device):
+        return FileCameraDevice(device, fps=fps)
+    # Only needed for real devices
+    import cv2
+    capture = cv2.VideoCapture(device, cv2.CAP_V4L2)
+    capture.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    capture.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    capture.set(cv2.CAP_PROP_FPS, fps)
+    # Keep the driver queue short so reads return fresh frames
+    capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return capture
+
+
+class CameraService:
+    """
+    Owns the camera for the whole application.
+
+    The device is opened once and read continuously in a background thread,
+    so exposure and white balance have settled and the newest frame can be
+    taken from the ring buffer instantly, instead of starting fswebcam (which
+    opens the device and waits for it to settle) for every snapshot.
+    """
+
+    def __init__(self, device="/dev/video0", width=1280, height=720, fps=15, buffer_frames=4, open_device=open_camera):
+        self.device = device
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.buffer = FrameRingBuffer(buffer_frames)
+        self.open_device = open_device
+        self.capture = None
+        self.frame_count = 0
+        self.dropped_reads = 0
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        """Opens the device and starts reading frames; raises OSError if it can't be opened."""
+        if self.running:
+            return self
+        self.capture = self.open_device(self.device, self.width, self.height, self.fps)
+        if not self.capture.isOpened():
+            raise OSError(f"Could not open camera {self.device}")
+        self.running = True
+        self.thread = threading.Thread(target=self._capture, daemon=True)
+        self.thread.start()
+        return self
+
+    def _capture(self):
+        while self.running:
+            ok, pixels = self.capture.read()
+            if not ok:
+                self.dropped_reads += 1
+                # Don't spin if the device went away
+                time.sleep(0.1)
+                continue
+            self.buffer.put(CameraFrame(pixels=pixels, timestamp=time.monotonic(), index=self.frame_count))
+            self.frame_count += 1
+
+    def latest_frame(self, max_age=0.5, timeout=2.0):
+        """
+        Returns the newest frame, or None if no frame arrived within the timeout.
+
+        Args:
+        max_age (float): Frames older than this many seconds (e.g. a stalled device) are not returned.
+        timeout (float): Seconds to wait, e.g. for the first frame after start().
+        """
+        return self.buffer.latest(max_age=max_age, timeout=timeout)
+
+    def close(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+        if self.capture is not None:
+            self.capture.release()
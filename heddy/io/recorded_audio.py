@@ -0,0 +1,37 @@
+import io
+import wave
+from dataclasses import dataclass
+
+@dataclass
+class RecordedAudio:
+    """Captured microphone audio held in memory as raw little-endian PCM."""
+    pcm: memoryview
+    sample_rate: int = 16000
+    channels: int = 1
+    sample_width: int = 2
+
+    @property
+    def duration(self):
+        """Length of the recording in seconds."""
+        return len(self.pcm) / (self.sample_rate * self.channels * self.sample_width)
+
+    def as_wav_file(self):
+        """Returns the audio wrapped in a WAV header as a file-like object, for APIs that expect files."""
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as wf:
+            wf.setnchannels(self.channels)
+            wf.setsampwidth(self.sample_width)
+            wf.setframerate(self.sample_rate)
+            wf.writeframes(self.pcm)
+        buffer.seek(0)
+        return buffer
+
+
+def frame_rms(data, sample_width=2):
+    """Root mean square level of a chunk of 16-bit PCM audio."""
+    if sample_width != 2:
+        raise ValueError(f"Unsupported sample width: {sample_width}")
+    samples = memoryview(data).cast('h')
+    if not samples:
+        return 0.0
+    return (sum(sample * sample for sample in samples) / len(samples)) ** 0.5
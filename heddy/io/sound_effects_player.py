@@ -1,42 +1,295 @@
+import threading
+from collections import deque
 import pyaudio
 import wave
+import numpy as np
 from elevenlabs import play
 
 from heddy.application_event import ApplicationEvent, ApplicationEventType, ProcessingStatus
+from heddy.text_to_speech.text_to_speach_manager import PCMAudio, discard_audio
+
+SOUND_EFFECTS = [
+    "listening.wav",
+    "startrecording.wav",
+    "tricorder.wav",
+    "respond.wav",
+    "timerreset.wav",
+]
+
+MIXER_SAMPLE_RATE = 48000
+MIXER_BLOCK_FRAMES = 1024
+# Streamed PCM is handed to the mixer in blocks of this length, so stop() takes effect within one block
+PCM_WRITE_SECONDS = 0.05
+# How far streamed PCM may be queued ahead of the mixer
+PCM_QUEUE_SECONDS = 0.1
+
+def to_mono_int16(data, channels, sample_width=2):
+    """Converts interleaved 16-bit PCM bytes into mono samples."""
+    if sample_width != 2:
+        raise ValueError("only 16-bit PCM is supported")
+    samples = np.frombuffer(data, dtype=np.int16)
+    if channels == 1:
+        return samples
+    return samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+
+def decode_wav(file_path, sample_rate=MIXER_SAMPLE_RATE):
+    """Reads a 16-bit WAV file into mono int16 samples at the given sample rate."""
+    with wave.open(file_path, 'rb') as wf:
+        if wf.getsampwidth() != 2:
+            raise ValueError(f"{file_path}: only 16-bit WAV files are supported")
+        channels = wf.getnchannels()
+        rate = wf.getframerate()
+        samples = to_mono_int16(wf.readframes(wf.getnframes()), channels)
+    return LinearResampler(rate, sample_rate)(samples)
+
+
+class LinearResampler:
+    """
+    Linearly interpolates int16 samples to another rate.
+
+    Keeps the last sample and the interpolation phase between calls, so a
+    stream resampled block by block has no seams at the block boundaries.
+    """
+
+    def __init__(self, source_rate, target_rate):
+        self.step = source_rate / target_rate
+        self.position = 0.0
+        self.last = None
+
+    def __call__(self, samples):
+        if self.step == 1.0 or not len(samples):
+            return samples
+        samples = samples.astype(np.float64)
+        if self.last is not None:
+            samples = np.concatenate(([self.last], samples))
+        # Only positions with a right-hand neighbour, the rest waits for the next block
+        positions = np.arange(self.position, len(samples) - 1, self.step)
+        if len(positions):
+            self.position = positions[-1] + self.step - (len(samples) - 1)
+        else:
+            self.position -= len(samples) - 1
+        self.last = samples[-1]
+        resampled = np.interp(positions, np.arange(len(samples)), samples)
+        return np.round(resampled).astype(np.int16)
+
+
+class MixerVoice:
+    """Samples queued for the mixer; streamed audio is appended with SoundEffectMixer.write until closed."""
+
+    def __init__(self, samples=None):
+        self.blocks = deque()
+        self.available = 0
+        self.closed = False
+        self.done = threading.Event()
+        if samples is not None:
+            self.blocks.append(samples)
+            self.available = len(samples)
+            self.closed = True
+
+    @property
+    def finished(self):
+        return self.closed and not self.available
+
+    def read(self, frames):
+        parts = []
+        while frames and self.blocks:
+            block = self.blocks[0]
+            parts.append(block[:frames])
+            if len(block) > frames:
+                self.blocks[0] = block[frames:]
+            else:
+                self.blocks.popleft()
+            frames -= len(parts[-1])
+            self.available -= len(parts[-1])
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int16)
+
+
+class SoundEffectMixer:
+    """
+    Plays decoded sound effects and streamed speech on one persistent output stream without blocking the caller.
+
+    Voices that overlap are summed (with clipping) block by block on a
+    background thread; the thread sleeps while nothing is queued.
+    """
+    def __init__(self, stream, block_frames=MIXER_BLOCK_FRAMES, sample_rate=MIXER_SAMPLE_RATE):
+        self.stream = stream
+        self.block_frames = block_frames
+        self.sample_rate = sample_rate
+        self.voices = []
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def play(self, samples) -> threading.Event:
+        """Starts playing the samples and returns an event that is set once they finished."""
+        voice = MixerVoice(samples)
+        with self.condition:
+            self.voices.append(voice)
+            self.condition.notify_all()
+        return voice.done
+
+    def open_voice(self) -> MixerVoice:
+        """Starts a voice that is fed with write() while its audio arrives."""
+        voice = MixerVoice()
+        with self.condition:
+            self.voices.append(voice)
+        return voice
+
+    def write(self, voice: MixerVoice, samples, max_queued=None, timeout=None):
+        """
+        Appends samples to a streamed voice.
+
+        Args:
+        max_queued (int): First wait until no more than this many samples are still queued.
+        timeout (float): Seconds to wait for room; returns False without writing if there is none.
+        """
+        with self.condition:
+            if max_queued is not None and not self.condition.wait_for(lambda: voice.available <= max_queued, timeout):
+                return False
+            voice.blocks.append(samples)
+            voice.available += len(samples)
+            self.condition.notify_all()
+        return True
+
+    def close(self, voice: MixerVoice, discard=False):
+        """Marks the end of a streamed voice; with discard, what is still queued is dropped."""
+        with self.condition:
+            if discard:
+                voice.blocks.clear()
+                voice.available = 0
+            voice.closed = True
+            self.condition.notify_all()
+
+    def _next_block(self):
+        with self.condition:
+            # A streamed voice waiting for data doesn't keep the thread busy
+            while not any(voice.available or voice.finished for voice in self.voices):
+                self.condition.wait()
+            block = np.zeros(self.block_frames, dtype=np.int32)
+            length = 0
+            for voice in self.voices:
+                part = voice.read(self.block_frames)
+                block[:len(part)] += part
+                length = max(length, len(part))
+            finished = [voice for voice in self.voices if voice.finished]
+            self.voices = [voice for voice in self.voices if not voice.finished]
+            # Writers waiting for room in a streamed voice
+            self.condition.notify_all()
+        return np.clip(block[:length], -32768, 32767).astype(np.int16), finished
+
+    def _run(self):
+        while True:
+            block, finished = self._next_block()
+            if len(block):
+                self.stream.write(block.tobytes())
+            for voice in finished:
+                voice.done.set()
+
 
 class AudioPlayer:
-    def __init__(self):
-        """Initializes the sound effects player."""
-        self.pyaudio_instance = pyaudio.PyAudio()
+    def __init__(self, engine=None, effects=SOUND_EFFECTS):
+        """
+        Initializes the sound effects player, sharing the application's AudioEngine if one is given.
 
-    def play_sound(self, file_path):
+        All effects are decoded once up front and played through a mixer, so
+        play_sound returns immediately instead of reading the file and
+        blocking until it has finished.
+        """
+        self.engine = engine
+        self.pyaudio_instance = engine.pyaudio_instance if engine else pyaudio.PyAudio()
+        # The mixer's output stream is kept open between responses; speech is mixed into it too
+        self.output_streams = {}
+        self.effects = {}
+        for file_path in effects:
+            self.load_sound(file_path)
+        self.mixer = SoundEffectMixer(self.get_output_stream(MIXER_SAMPLE_RATE))
+        # Set by stop() to cut off streamed playback, e.g. on barge-in
+        self.interrupted = threading.Event()
+
+    def stop(self):
+        """Interrupts streamed playback until resume() is called."""
+        self.interrupted.set()
+
+    def resume(self):
+        self.interrupted.clear()
+
+    def load_sound(self, file_path):
+        """Decodes a sound effect into memory, returning the cached samples."""
+        if file_path not in self.effects:
+            self.effects[file_path] = decode_wav(file_path)
+        return self.effects[file_path]
+
+    def play_sound(self, file_path, block=False):
         """
         Play a sound effect from the specified file path.
 
         Args:
         file_path (str): The path to the wave file to play.
+        block (bool): Wait until the effect has finished playing.
+        """
+        done = self.mixer.play(self.load_sound(file_path))
+        if block:
+            done.wait()
+        return done
+
+    def get_output_stream(self, sample_rate, channels=1, sample_width=2):
+        """Returns a persistent output stream for the given PCM format, opening it on first use."""
+        if self.engine is not None:
+            return self.engine.get_output_stream(sample_rate, channels, sample_width)
+        key = (sample_rate, channels, sample_width)
+        if key not in self.output_streams:
+            self.output_streams[key] = self.pyaudio_instance.open(
+                format=self.pyaudio_instance.get_format_from_width(sample_width),
+                channels=channels,
+                rate=sample_rate,
+                output=True
+            )
+        return self.output_streams[key]
+
+    def play_pcm(self, audio: PCMAudio):
         """
-        # Open the wave file
-        wf = wave.open(file_path, 'rb')
-
-        # Open a stream for audio playback
-        stream = self.pyaudio_instance.open(format=self.pyaudio_instance.get_format_from_width(wf.getsampwidth()),
-                                            channels=wf.getnchannels(),
-                                            rate=wf.getframerate(),
-                                            output=True)
-
-        # Read data in chunks and play
-        data = wf.readframes(1024)
-        while data:
-            stream.write(data)
-            data = wf.readframes(1024)
-
-        # Cleanup
-        stream.stop_stream()
-        stream.close()
-    
+        Play raw PCM audio chunk by chunk as it arrives.
+
+        The audio is resampled into the effects mixer, so speech and effects
+        share the one output stream. It is handed over in short blocks and
+        stop() is checked between them, so a long chunk (e.g. a whole cached
+        phrase) can be cut off too.
+
+        Args:
+        audio (PCMAudio): The streamed audio to play.
+        """
+        resample = LinearResampler(audio.sample_rate, self.mixer.sample_rate)
+        frame_size = audio.channels * audio.sample_width
+        block_size = max(1, int(audio.sample_rate * PCM_WRITE_SECONDS)) * frame_size
+        max_queued = int(self.mixer.sample_rate * PCM_QUEUE_SECONDS)
+        voice = self.mixer.open_voice()
+        remainder = b""
+        for chunk in audio.chunks:
+            data = remainder + chunk
+            # Network chunks don't respect frame boundaries, carry partial frames over
+            usable = len(data) - len(data) % frame_size
+            remainder = data[usable:]
+            for start in range(0, usable, block_size):
+                samples = resample(to_mono_int16(data[start:min(start + block_size, usable)], audio.channels, audio.sample_width))
+                while not self.mixer.write(voice, samples, max_queued=max_queued, timeout=PCM_WRITE_SECONDS):
+                    if self.interrupted.is_set():
+                        break
+                if self.interrupted.is_set():
+                    self.mixer.close(voice, discard=True)
+                    discard_audio(audio)
+                    return
+        self.mixer.close(voice)
+        while not voice.done.wait(PCM_WRITE_SECONDS):
+            if self.interrupted.is_set():
+                self.mixer.close(voice, discard=True)
+                return
+
     def play(self, event: ApplicationEvent):
-        play(event.request)
+        # Encoded audio (mp3) is played by elevenlabs in one go; only PCM can be stopped
+        if isinstance(event.request, PCMAudio):
+            self.play_pcm(event.request)
+        else:
+            play(event.request)
         return ApplicationEvent(
             type=ApplicationEventType.PLAY,
             status=ProcessingStatus.SUCCESS
@@ -44,5 +297,8 @@ class AudioPlayer:
 
 
     def __del__(self):
-        """Ensure PyAudio instance is terminated upon deletion."""
-        self.pyaudio_instance.terminate()
+        """Ensure PyAudio instance is terminated upon deletion, unless it belongs to the AudioEngine."""
+        for stream in self.output_streams.values():
+            stream.close()
+        if self.engine is None:
+            self.pyaudio_instance.terminate()
@@ -0,0 +1,112 @@
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+
+# PocketSphinx reports segment probabilities as logs in base 1.0001
+POCKETSPHINX_LOG_BASE = 1.0001
+
+
+def segment_confidence(log_prob):
+    """Converts a PocketSphinx segment log probability into a 0..1 confidence."""
+    return min(1.0, math.pow(POCKETSPHINX_LOG_BASE, log_prob))
+
+
+@dataclass
+class KeywordDetection:
+    word: str
+    timestamp: float
+    confidence: float = 1.0
+
+
+class KeywordSubscription:
+    """
+    Bounded, timestamped queue of bus items for one consumer.
+
+    Consumers pass `since` to get() to skip everything published before a
+    given moment (e.g. the last state transition); skipped and overflowed
+    items are counted instead of silently vanishing.
+    """
+
+    def __init__(self, max_items=256):
+        self.items = deque(maxlen=max_items)
+        self.condition = threading.Condition()
+        self.dropped = 0
+        self.stale = 0
+
+    def put(self, timestamp, item):
+        with self.condition:
+            if len(self.items) == self.items.maxlen:
+                self.dropped += 1
+            self.items.append((timestamp, item))
+            self.condition.notify_all()
+
+    def get(self, timeout=None, since=None, stop=None):
+        """
+        Returns the next item published at or after `since`, or None on timeout or once stop is set.
+
+        Args:
+        timeout (float): Seconds to wait for an item, None waits forever.
+        since (float): Bus timestamp before which items are discarded.
+        stop (threading.Event): Gives up waiting when set; call wake() after setting it.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.condition:
+            while True:
+                while self.items:
+                    timestamp, item = self.items.popleft()
+                    if since is None or timestamp >= since:
+                        return item
+                    self.stale += 1
+                if stop is not None and stop.is_set():
+                    return None
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self.condition.wait(remaining)
+
+    def wake(self):
+        """Wakes consumers blocked in get(), so they notice their stop event."""
+        with self.condition:
+            self.condition.notify_all()
+
+
+class KeywordEventBus:
+    """
+    Fans keyword detections (and events posted by other components) out to subscribers.
+
+    Every item is stamped with the bus clock when it is published, so
+    consumers can discard anything older than their current time window.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.subscribers = []
+        self.lock = threading.Lock()
+
+    def subscribe(self, max_items=256):
+        subscription = KeywordSubscription(max_items)
+        with self.lock:
+            self.subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            if subscription in self.subscribers:
+                self.subscribers.remove(subscription)
+
+    def publish(self, item, timestamp=None):
+        """Delivers item to every subscriber, returning the timestamp it was published with."""
+        if timestamp is None:
+            timestamp = self.clock()
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for subscription in subscribers:
+            subscription.put(timestamp, item)
+        return timestamp
+
+    def publish_detection(self, word, confidence=1.0):
+        detection = KeywordDetection(word, self.clock(), confidence)
+        self.publish(detection, detection.timestamp)
+        return detection
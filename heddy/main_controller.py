@@ -1,19 +1,51 @@
 import os
 from heddy.ai_backend.zapier_manager import ZapierManager
 from heddy.application_event import ApplicationEvent, ApplicationEventType, ProcessingStatus
+from heddy.io.audio_engine import AudioEngine
+from heddy.io.camera_service import CameraService
 from heddy.io.sound_effects_player import AudioPlayer
 from heddy.speech_to_text.faster_whisper_transcriber import WhisperTranscriber
 from heddy.speech_to_text.stt_manager import STTManager
 from heddy.text_to_speech.text_to_speach_manager import TTSManager
 from heddy.word_detector import WordDetector
-from heddy.io.audio_recorder import start_recording, stop_recording
+from heddy.io.audio_recorder import AudioRecorder, VoiceActivityDetector, recorder as default_recorder
 from heddy.speech_to_text.assemblyai_transcriber import AssemblyAITranscriber
 from heddy.ai_backend.assistant_manager import AssistantResultStatus, AssitsantResult, ThreadManager, StreamingManager
+from heddy.ai_backend.tool_executor import ToolCallExecutor
+from heddy.ai_backend.chat_completions_manager import ChatCompletionsManager, DEFAULT_SYSTEM_PROMPT
+from heddy.ai_backend.conversation_store import ConversationStore
 from heddy.text_to_speech.eleven_labs import ElevenLabsManager
+from heddy.text_to_speech.streaming_pipeline import StreamingTTSPipeline
+from heddy.text_to_speech.tts_cache import TTSCache
+from heddy.text_to_speech.espeak import EspeakTTS
 from heddy.vision_module import VisionModule
+from heddy.scene_cache import SceneCache
+from heddy.image_preprocessing import ImageSettings
+from heddy.http_session import http_sessions
+from heddy.tracing import tracer
 import openai
 from dotenv import load_dotenv
 import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+
+
+GREETING = 'Hello! How can I assist you today?'
+
+# Phrases synthesized into the TTS cache at startup
+KNOWN_PHRASES = [GREETING]
+
+
+# Stages during which saying the wake word interrupts the response
+INTERRUPTIBLE_EVENTS = [
+    ApplicationEventType.SYNTHESIZE,
+    ApplicationEventType.PLAY,
+    ApplicationEventType.PLAY_STREAM,
+    ApplicationEventType.AI_INTERACT,
+    ApplicationEventType.AI_TOOL_RETURN,
+]
 
 
 class MainController:
@@ -35,7 +67,16 @@ class MainController:
             synthesizer,
             audio_player,
             vision_module,
-            word_detector
+            word_detector,
+            speech_pipeline=None,
+            zapier=None,
+            recorder=None,
+            streaming_stt=False,
+            barge_in=False,
+            speculate=True,
+            snapshot_mode="describe",
+            tool_workers=4,
+            tool_timeout=30.0
         ) -> None:
         self.assistant = assistant
         self.transcriber = transcriber
@@ -43,43 +84,66 @@ class MainController:
         self.vision_module = vision_module
         self.audio_player = audio_player
         self.word_detector = word_detector
+        self.speech_pipeline = speech_pipeline
+        self.tool_executor = ToolCallExecutor(self.process_event, max_workers=tool_workers, timeout=tool_timeout)
+        self.zapier = zapier or ZapierManager()
+        self.recorder = recorder or default_recorder
+        self.streaming_stt = streaming_stt
+        self.stt_stream = None
+        self.barge_in = barge_in
+        self.response_started = None
+        self.speculate = speculate
+        self.snapshot_mode = snapshot_mode
+        # Future of the assistant preparation started at START_RECORDING
+        self.preparation = None
+        self.prepare_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prepare")
 
     def process_event(self, event: ApplicationEvent):
         if event.type == ApplicationEventType.START:
             return ApplicationEvent(
                 ApplicationEventType.SYNTHESIZE,
-                request='Hello! How can I assist you today?'
+                request=GREETING
             )
         if event.type == ApplicationEventType.SYNTHESIZE:
             return self.synthesizer.synthesize(event)
         if event.type == ApplicationEventType.PLAY:
             return self.audio_player.play(event)
+        if event.type == ApplicationEventType.PLAY_STREAM:
+            return self.speech_pipeline.wait(event)
         if event.type == ApplicationEventType.LISTEN:
+            if not self.is_recording:
+                self.discard_preparation()
             return self.word_detector.listen(event)
         if event.type == ApplicationEventType.START_RECORDING:
-            self.audio_player.play_sound("startrecording.wav")  # Play start recording sound
+            self.start_preparation()
+            # Wait for the chime to end so it isn't recorded and taken for speech by the VAD
+            self.audio_player.play_sound("startrecording.wav", block=True)  # Play start recording sound
             self.start_recording()
             return ApplicationEvent(ApplicationEventType.LISTEN)
         if event.type == ApplicationEventType.USE_SNAPSHOT:
             self.audio_player.play_sound("tricorder.wav")  # Play take a picture sound
             self.set_picture_mode()
+            self.start_snapshot()
             return ApplicationEvent(ApplicationEventType.LISTEN)
         if event.type == ApplicationEventType.STOP_RECORDING:
-            self.audio_player.play_sound("respond.wav")  # Play stop recording/respond sound
             self.stop_recording()
+            # Effects play in the background, so stop first to keep the chime out of the recording
+            self.audio_player.play_sound("respond.wav")  # Play stop recording/respond sound
             self.word_detector.clear()
             return ApplicationEvent(
                 ApplicationEventType.TRANSCRIBE,
-                request="recorded_audio.wav"
+                request=self.transcription_request()
             )
         if event.type == ApplicationEventType.TRANSCRIBE:
             return self.transcriber.transcribe_audio_file(event)
         if event.type == ApplicationEventType.GET_SNAPSHOT:
             return self.get_snapshot(event)
         if event.type in [ApplicationEventType.AI_INTERACT, ApplicationEventType.AI_TOOL_RETURN]:
+            if event.type == ApplicationEventType.AI_INTERACT:
+                self.finish_preparation()
             return self.assistant.handle_streaming_interaction(event)
         if event.type == ApplicationEventType.ZAPIER:
-            return ZapierManager().handle_message(event)
+            return self.zapier.handle_message(event)
 
     def process_result(self, event: ApplicationEvent):
         if event.status == ProcessingStatus.INIT:
@@ -89,11 +153,14 @@ class MainController:
                 type=ApplicationEventType.PLAY,
                 request=event.result
             )
-        if event.type == ApplicationEventType.PLAY:
+        if event.type in [ApplicationEventType.PLAY, ApplicationEventType.PLAY_STREAM]:
             return ApplicationEvent(
                 type=ApplicationEventType.LISTEN,
             )
         if event.type == ApplicationEventType.LISTEN:
+            if isinstance(event.result, ApplicationEvent):
+                # Posted by another component, e.g. the recorder ending on silence
+                return self.handle_posted_event(event.result)
             return self.handle_detected_word(event.result)
         if event.type == ApplicationEventType.TRANSCRIBE:
             print(f"Transcription result: '{event.result}'")
@@ -108,8 +175,12 @@ class MainController:
                 request=event.result
             )
         if event.type == ApplicationEventType.GET_SNAPSHOT:
+            spoken = self.speaks_snapshot()
             self.picture_mode = False
             print(f"Snapshot Result: '{event.result}'")
+            if spoken:
+                # Already being spoken by get_snapshot, the assistant is skipped
+                return ApplicationEvent(ApplicationEventType.PLAY_STREAM)
             return ApplicationEvent(
                 type=ApplicationEventType.AI_INTERACT,
                 request=event.result
@@ -121,45 +192,107 @@ class MainController:
     def handle_ai_result(self, result: AssitsantResult):
         if result.status == AssistantResultStatus.SUCCESS:
             print(f"Assistant Response: '{result}'")
+            if result.streamed:
+                # The response is already being spoken sentence by sentence
+                return ApplicationEvent(ApplicationEventType.PLAY_STREAM)
             return ApplicationEvent(
                 type=ApplicationEventType.SYNTHESIZE,
                 request=result.response
             )
         elif result.status == AssistantResultStatus.ACTION_REQUIED:
-            tool_calls = result.calls["tools"]
-            for tool_call in tool_calls:
-                event = self.run(event=ApplicationEvent(
-                    type=tool_call["type"],
-                    request=tool_call["args"]
-                ), process_result=self.process_func_trigger)
-                tool_call["output"] = event.result
+            self.tool_executor.run_all(result.calls["tools"])
             return ApplicationEvent(
                 type=ApplicationEventType.AI_TOOL_RETURN,
                 request=result.calls
             )
+        elif result.status == AssistantResultStatus.CANCELLED:
+            print("Assistant response cancelled")
+            return ApplicationEvent(ApplicationEventType.LISTEN)
         else:
             raise NotImplemented(f"{result=}")
     
-    def process_func_trigger(self, event: ApplicationEvent):
-        return ApplicationEvent(
-            type=ApplicationEventType.EXIT,
-            result=event.result
-        )
-    
+    def start_preparation(self):
+        """Speculatively gets the assistant ready for the next turn while the user is still speaking."""
+        if self.speculate and hasattr(self.assistant, "prepare") and self.preparation is None:
+            self.preparation = self.prepare_executor.submit(self.prepare_assistant)
+
+    def prepare_assistant(self):
+        """Returns the seconds of critical-path work the assistant did ahead of time."""
+        try:
+            with tracer.span("prepare"):
+                return self.assistant.prepare()
+        except Exception as e:
+            print(f"Speculative preparation failed: {e}")
+            return 0.0
+
+    def finish_preparation(self):
+        """Waits for the speculative preparation and records how much time it took off the critical path."""
+        if self.preparation is None:
+            return
+        preparation, self.preparation = self.preparation, None
+        wait_start = time.perf_counter()
+        ahead = preparation.result()
+        waited = time.perf_counter() - wait_start
+        # Whatever is still running when the transcript arrives is not saved
+        saved = max(0.0, ahead - waited)
+        tracer.observe("speculation_saved", saved, waited=waited)
+        print(f"Speculative preparation saved {saved:.3f}s")
+
+    def discard_preparation(self):
+        """Drops a preparation the turn didn't use (e.g. a spoken snapshot), so the next recording starts a fresh one."""
+        if self.preparation is not None:
+            preparation, self.preparation = self.preparation, None
+            preparation.cancel()
+
     def get_snapshot(self, event: ApplicationEvent):
         # TODO: move to vision module logic
+        if self.speaks_snapshot():
+            # The vision model answers the question itself and is spoken while it streams in
+            self.speech_pipeline.start()
+            event.result = self.vision_module.describe_captured_image(event.request, on_token=self.speech_pipeline.feed)
+            self.speech_pipeline.finish()
+            event.status = ProcessingStatus.SUCCESS
+            return event
+        if self.picture_mode and self.snapshot_mode == "direct" and getattr(self.assistant, "supports_images", False):
+            # The assistant looks at the image itself, saving the separate description request
+            prompt = self.vision_module.get_image_prompt(event.request)
+            if prompt is not None:
+                event.result = prompt
+                event.status = ProcessingStatus.SUCCESS
+                return event
         event.result = self.vision_module.get_description_of_camera_view(event.request)
+        event.status = ProcessingStatus.SUCCESS
         return event
 
+    def speaks_snapshot(self):
+        return self.picture_mode and self.snapshot_mode == "speak" and self.speech_pipeline is not None
+
     # TODO: move to an interaction manager(?) module
     def stop_recording(self, ):
-        stop_recording()
+        self.recorder.stop_recording()
+        if self.stt_stream is not None:
+            self.recorder.remove_listener(self.stt_stream.feed)
         self.is_recording = False
         print("Recording stopped. Processing...")
+
+    def transcription_request(self):
+        # A streaming transcription only has the tail left to decode
+        if self.stt_stream is not None:
+            stream, self.stt_stream = self.stt_stream, None
+            return stream
+        return self.recorder.get_audio()
     
     # TODO: move to an interaction manager(?) module
     def start_recording(self,):
-        start_recording()
+        if self.streaming_stt and self.transcriber.supports_streaming:
+            try:
+                self.stt_stream = self.transcriber.start_stream()
+            except Exception as e:
+                # The recording is transcribed in one go after it stops instead
+                print(f"Failed to start streaming transcription: {e}")
+            else:
+                self.recorder.add_listener(self.stt_stream.feed)
+        self.recorder.start_recording()
         self.is_recording = True
         print("Recording started...")
     
@@ -169,6 +302,16 @@ class MainController:
             self.picture_mode = True
             print("Picture mode activated")
 
+    def start_snapshot(self):
+        # Capture and encode while the user keeps speaking, GET_SNAPSHOT picks the image up
+        if self.picture_mode:
+            self.vision_module.capture_image_async()
+
+    def handle_posted_event(self, event: ApplicationEvent):
+        if event.type == ApplicationEventType.STOP_RECORDING and not self.is_recording:
+            return ApplicationEvent(ApplicationEventType.LISTEN)
+        return event
+
     # TODO: move to an interaction(?) module
     def handle_detected_word(self, word):
         if "computer" in word and not self.is_recording:
@@ -179,6 +322,56 @@ class MainController:
             return ApplicationEvent(ApplicationEventType.STOP_RECORDING)
         return ApplicationEvent(ApplicationEventType.LISTEN)
     
+    def interrupt(self):
+        """Stops playback, pending synthesis and the in-flight assistant run."""
+        self.audio_player.stop()
+        # The assistant goes first, so no delta slips into the pipeline after its cancel
+        if hasattr(self.assistant, "cancel"):
+            self.assistant.cancel()
+        if self.speech_pipeline:
+            self.speech_pipeline.cancel()
+
+    def watch_for_barge_in(self, interrupted, stop):
+        if self.word_detector.wait_for("computer", stop):
+            print("Barge-in detected")
+            interrupted.set()
+            self.interrupt()
+
+    def process_interruptible(self, event: ApplicationEvent):
+        """
+        Processes an event while listening for the wake word.
+
+        If the user says "computer" before the stage finishes, playback and
+        the assistant run are cut off and START_RECORDING is returned instead
+        of the stage's result.
+        """
+        if not self.barge_in or event.type not in INTERRUPTIBLE_EVENTS:
+            return self.process_event(event)
+        self.audio_player.resume()
+        interrupted = threading.Event()
+        stop = threading.Event()
+        watcher = threading.Thread(target=self.watch_for_barge_in, args=(interrupted, stop), daemon=True)
+        watcher.start()
+        try:
+            result = self.process_event(event)
+        finally:
+            stop.set()
+            self.word_detector.wake()
+            watcher.join()
+        if interrupted.is_set():
+            return ApplicationEvent(ApplicationEventType.START_RECORDING)
+        return result
+
+    def trace_transition(self, event: ApplicationEvent):
+        """Starts a new trace turn on each recording and times the round trip from STOP_RECORDING to LISTEN."""
+        if event.type == ApplicationEventType.START_RECORDING:
+            tracer.start_turn()
+        elif event.type == ApplicationEventType.STOP_RECORDING:
+            self.response_started = time.perf_counter()
+        elif event.type == ApplicationEventType.LISTEN and self.response_started is not None:
+            tracer.record("round_trip", self.response_started)
+            self.response_started = None
+
     def run(self, event: ApplicationEvent, process_result=None) -> ApplicationEvent:
         process_result = process_result or self.process_result
         current_event = event
@@ -186,7 +379,9 @@ class MainController:
             print(current_event.type)
             if current_event.type == ApplicationEventType.START:
                 self.audio_player.play_sound("listening.wav")  # Play start listening sound
-            result = self.process_event(current_event)
+            self.trace_transition(current_event)
+            with tracer.span(current_event.type.name):
+                result = self.process_interruptible(current_event)
 
             if event.status == ProcessingStatus.ERROR:
                 raise RuntimeError(event.error)
@@ -195,45 +390,308 @@ class MainController:
         return current_event
         
 
+def prewarm_openai(openai_client):
+    # The response is irrelevant, the point is to have a live TLS connection in the pool
+    try:
+        openai_client.models.list()
+    except Exception as e:
+        print(f"Failed to pre-warm OpenAI connection: {e}")
+
+
 def initialize(args):
     load_dotenv()
     print("System initializing...")
+    tracer.configure(jsonl_path=args.trace_file)
+    if args.metrics_port:
+        tracer.serve_metrics(args.metrics_port)
+    http_sessions.configure(
+        pool_maxsize=args.http_pool_size,
+        retries=args.http_retries,
+        backoff_factor=args.http_backoff
+    )
     # Initialize OpenAI client ok computer send a little zapier tick please reply
     openai_client = openai.OpenAI(
-        api_key=os.getenv("OPENAI_API_KEY")
+        api_key=os.getenv("OPENAI_API_KEY"),
+        max_retries=args.http_retries,
+        # Keep connections to the OpenAI API alive between turns
+        http_client=httpx.Client(
+            limits=httpx.Limits(
+                max_connections=args.http_pool_size,
+                max_keepalive_connections=args.http_pool_size
+            )
+        )
     ) # This line initializes openai_client with the openai library itself
+    if not args.no_prewarm:
+        http_sessions.prewarm()
+        threading.Thread(target=prewarm_openai, args=(openai_client,), daemon=True).start()
 
 
     # Initialize modules with provided API keys
     if args.transcriber.lower() == "whisper":
-        transcriber = WhisperTranscriber() 
+        transcriber = WhisperTranscriber(
+            model_size=args.whisper_model,
+            device=args.whisper_device,
+            compute_type=args.whisper_compute_type,
+            beam_size=args.whisper_beam_size,
+            cpu_threads=args.whisper_cpu_threads,
+            num_workers=args.whisper_num_workers,
+            # Load while the rest of the system starts up
+            background_load=True
+        )
     if args.transcriber.lower() == "assemblyai":
         transcriber = AssemblyAITranscriber(api_key=os.getenv("ASSEMBLYAI_API_KEY"))
     
     # Adjusted to use the hardcoded Assistant ID
-    eleven_labs_manager = ElevenLabsManager(api_key=os.getenv("ELEVENLABS_API_KEY"))
-    vision_module = VisionModule(openai_api_key=os.getenv("OPENAI_API_KEY"))
+    eleven_labs_manager = ElevenLabsManager(
+        api_key=os.getenv("ELEVENLABS_API_KEY"),
+        output_format=args.tts_output_format
+    )
+    camera = None
+    if args.camera == "service":
+        try:
+            camera = CameraService(device=args.camera_device, fps=args.camera_fps).start()
+        except (ImportError, OSError) as e:
+            print(f"Camera service unavailable, falling back to fswebcam: {e}")
+    vision_module = VisionModule(
+        openai_api_key=os.getenv("OPENAI_API_KEY"),
+        camera=camera,
+        scene_cache=SceneCache(
+            ttl=args.scene_cache_ttl,
+            threshold=args.scene_change_threshold,
+            max_entries=args.scene_cache_size
+        ) if args.scene_cache_ttl > 0 else None,
+        image_settings=ImageSettings(
+            max_size=args.image_size,
+            format=args.image_format,
+            quality=args.image_quality,
+            detail=args.image_detail
+        )
+    )
+
+    # One audio engine owns the microphone and output streams for every component
+    audio_engine = AudioEngine()
+    audio_engine.start()
+    audio_player = AudioPlayer(engine=audio_engine)
+    tts_cache = None
+    if args.tts_cache_size > 0:
+        tts_cache = TTSCache(
+            max_entries=args.tts_cache_size,
+            disk_dir=args.tts_cache_dir,
+            max_disk_bytes=args.tts_cache_disk_mb * 1024 * 1024
+        )
+    local_synthesizer = None
+    if args.synthesizer.lower() == "espeak" or args.tts_fallback.lower() == "espeak" or (
+        args.tts_fallback.lower() == "auto" and EspeakTTS.available()
+    ):
+        local_synthesizer = EspeakTTS()
+    if args.synthesizer.lower() == "espeak":
+        tts_manager = TTSManager(local_synthesizer, cache=tts_cache)
+    else:
+        tts_manager = TTSManager(
+            eleven_labs_manager,
+            cache=tts_cache,
+            fallback=local_synthesizer,
+            latency_budget=args.tts_latency_budget
+        )
+    if tts_cache is not None:
+        # Before START, so the greeting is synthesized once and played from the cache
+        tts_manager.prefetch(KNOWN_PHRASES)
+        tracer.add_gauges("tts_cache", tts_cache.stats)
+    speech_pipeline = None
+    if args.stream_tts:
+        speech_pipeline = StreamingTTSPipeline(tts_manager, audio_player)
 
-    # Initialize ThreadManager and StreamingManager
-    thread_manager = ThreadManager(openai_client)
-    streaming_manager = StreamingManager(thread_manager, eleven_labs_manager, assistant_id="asst_3D8tACoidstqhbw5JE2Et2st")
+    if args.assistant_backend == "chat":
+        # One streaming request per turn, history is kept locally
+        streaming_manager = ChatCompletionsManager(
+            openai_client,
+            model=args.chat_model,
+            store=ConversationStore(DEFAULT_SYSTEM_PROMPT, max_tokens=args.history_tokens),
+            tts_pipeline=speech_pipeline,
+            vision_module=vision_module
+        )
+    else:
+        # Initialize ThreadManager and StreamingManager
+        thread_manager = ThreadManager(openai_client, audio_player=audio_player)
+        streaming_manager = StreamingManager(
+            thread_manager,
+            eleven_labs_manager,
+            assistant_id="asst_3D8tACoidstqhbw5JE2Et2st",
+            tts_pipeline=speech_pipeline,
+            vision_module=vision_module
+        )
 
-    word_detector = WordDetector()
-    return MainController(
+    word_detector = WordDetector(audio_engine=audio_engine)
+    vad = VoiceActivityDetector(threshold=args.vad_threshold) if args.vad_threshold > 0 else None
+    recorder = AudioRecorder(
+        vad=vad,
+        auto_stop_ms=args.auto_stop_ms,
+        on_auto_stop=lambda: word_detector.post(ApplicationEvent(ApplicationEventType.STOP_RECORDING)),
+        engine=audio_engine
+    )
+    controller = MainController(
         assistant=streaming_manager,
         transcriber=STTManager(transcriber=transcriber),
         vision_module=vision_module,
-        audio_player=AudioPlayer(),
+        audio_player=audio_player,
         word_detector=word_detector,
-        synthesizer=TTSManager(eleven_labs_manager)
+        synthesizer=tts_manager,
+        speech_pipeline=speech_pipeline,
+        zapier=ZapierManager(),
+        streaming_stt=args.streaming_stt,
+        recorder=recorder,
+        barge_in=args.barge_in,
+        speculate=not args.no_speculate,
+        snapshot_mode=args.snapshot_mode,
+        tool_workers=args.tool_workers,
+        tool_timeout=args.tool_timeout
     )
+    return controller
 
 def parse_cli_args(argv=None):
     parser = argparse.ArgumentParser("heddy")
     parser.add_argument("--transcriber", type=str, default="assemblyai")
-    return parser.parse_args(argv)
+    parser.add_argument("--whisper-model", type=str, default=os.getenv("WHISPER_MODEL", "medium"))
+    parser.add_argument("--whisper-device", type=str, default=os.getenv("WHISPER_DEVICE", "cpu"))
+    parser.add_argument("--whisper-compute-type", type=str, default=os.getenv("WHISPER_COMPUTE_TYPE", "int8"))
+    parser.add_argument("--whisper-beam-size", type=int, default=int(os.getenv("WHISPER_BEAM_SIZE", 4)))
+    parser.add_argument(
+        "--whisper-cpu-threads",
+        type=int,
+        default=int(os.getenv("WHISPER_CPU_THREADS", 0)),
+        help="CPU threads used by faster-whisper (0 lets CTranslate2 decide)"
+    )
+    parser.add_argument("--whisper-num-workers", type=int, default=int(os.getenv("WHISPER_NUM_WORKERS", 1)))
+    parser.add_argument("--synthesizer", type=str, default="elevenlabs", help="elevenlabs or espeak (local, offline)")
+    parser.add_argument(
+        "--tts-fallback",
+        type=str,
+        default="auto",
+        help="Local synthesizer used when ElevenLabs fails or is too slow: espeak, auto (espeak if installed) or none"
+    )
+    parser.add_argument(
+        "--tts-latency-budget",
+        type=float,
+        default=1.5,
+        help="Seconds to wait for ElevenLabs to start returning audio before falling back (0 waits indefinitely)"
+    )
+    parser.add_argument("--tts-cache-size", type=int, default=128, help="Synthesized phrases kept in memory (0 disables the cache)")
+    parser.add_argument("--tts-cache-dir", type=str, default=None, help="Directory for the on-disk TTS cache tier")
+    parser.add_argument("--tts-cache-disk-mb", type=int, default=256, help="Size limit of the on-disk TTS cache")
+    parser.add_argument(
+        "--streaming-stt",
+        action="store_true",
+        help="Transcribe while the user is still speaking instead of after the recording stops"
+    )
+    parser.add_argument(
+        "--vad-threshold",
+        type=float,
+        default=500,
+        help="Minimum RMS level counted as speech; silence around speech is trimmed before STT (0 disables)"
+    )
+    parser.add_argument(
+        "--auto-stop-ms",
+        type=int,
+        default=0,
+        help="End the recording after this much silence following speech (0 waits for 'reply')"
+    )
+    parser.add_argument(
+        "--barge-in",
+        action="store_true",
+        help="Keep listening while responding; saying 'computer' interrupts and starts a new recording "
+             "(needs a pcm_* --tts-output-format, encoded audio can't be stopped)"
+    )
+    parser.add_argument(
+        "--assistant-backend",
+        type=str,
+        default="assistants",
+        choices=["assistants", "chat"],
+        help="OpenAI Assistants threads, or chat completions with locally kept history (one request per turn)"
+    )
+    parser.add_argument("--chat-model", type=str, default="gpt-4o-mini", help="Model used by the chat backend")
+    parser.add_argument(
+        "--history-tokens",
+        type=int,
+        default=3000,
+        help="Approximate token budget of the chat backend's history before older turns are summarized"
+    )
+    parser.add_argument(
+        "--snapshot-mode",
+        type=str,
+        default="describe",
+        choices=["describe", "direct", "speak"],
+        help=(
+            "describe: a vision request describes the snapshot for the assistant; "
+            "direct: the image is attached to the assistant message; "
+            "speak: the vision model answers and is spoken as it streams (needs --stream-tts)"
+        )
+    )
+    parser.add_argument(
+        "--camera",
+        type=str,
+        default="service",
+        choices=["service", "fswebcam"],
+        help="service: keep the camera open and reuse its latest frame; fswebcam: capture each snapshot separately"
+    )
+    parser.add_argument(
+        "--camera-device",
+        type=str,
+        default="/dev/video0",
+        help="V4L2 device, or an image file or directory played back as a fake camera"
+    )
+    parser.add_argument("--camera-fps", type=int, default=15)
+    parser.add_argument(
+        "--scene-cache-ttl",
+        type=float,
+        default=60.0,
+        help="Seconds a snapshot description is reused while the scene doesn't change (0 disables)"
+    )
+    parser.add_argument(
+        "--scene-change-threshold",
+        type=int,
+        default=10,
+        help="Differing bits of the 256 bit frame hash up to which the scene counts as unchanged"
+    )
+    parser.add_argument("--scene-cache-size", type=int, default=32)
+    parser.add_argument("--image-size", type=int, default=768, help="Longest side of snapshots sent to the vision API")
+    parser.add_argument("--image-format", type=str, default="jpeg", choices=["jpeg", "webp", "png"])
+    parser.add_argument("--image-quality", type=int, default=80, help="JPEG/WebP quality of snapshots")
+    parser.add_argument("--image-detail", type=str, default="low", choices=["low", "high", "auto"], help="Vision API detail level")
+    parser.add_argument("--tool-workers", type=int, default=4, help="Maximum number of tool calls run in parallel")
+    parser.add_argument("--tool-timeout", type=float, default=30.0, help="Seconds to wait for each tool call")
+    parser.add_argument("--http-pool-size", type=int, default=8, help="Keep-alive connections per API host")
+    parser.add_argument("--http-retries", type=int, default=3, help="Retries for failed API requests")
+    parser.add_argument("--http-backoff", type=float, default=0.3, help="Exponential backoff factor between retries")
+    parser.add_argument("--no-prewarm", action="store_true", help="Don't open API connections at startup")
+    parser.add_argument(
+        "--no-speculate",
+        action="store_true",
+        help="Don't prepare the assistant thread and connection while the user is still speaking"
+    )
+    parser.add_argument("--trace-file", type=str, default=None, help="Append per-stage timing spans to this JSONL file")
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=0,
+        help="Serve p50/p95/p99 stage latencies in Prometheus text format on this port (0 disables)"
+    )
+    parser.add_argument(
+        "--stream-tts",
+        action="store_true",
+        help="Speak assistant responses sentence by sentence while they stream in"
+    )
+    parser.add_argument(
+        "--tts-output-format",
+        type=str,
+        default="pcm_22050",
+        help="ElevenLabs output format; pcm_* formats are played while they download"
+    )
+    args = parser.parse_args(argv)
+    if args.barge_in and not args.tts_output_format.startswith("pcm_"):
+        parser.error("--barge-in needs a pcm_* --tts-output-format, encoded audio can't be interrupted")
+    return args
 
 if __name__ == "__main__":
     args = parse_cli_args()
     main = initialize(args)
-    main.run(ApplicationEvent(ApplicationEventType.START))
\ No newline at end of file
+    main.run(ApplicationEvent(ApplicationEventType.START))
@@ -0,0 +1,84 @@
+import re
+import threading
+import time
+from dataclasses import dataclass
+
+from heddy.image_preprocessing import hash_distance
+
+
+def normalize_prompt(prompt):
+    """Folds case, whitespace and trailing punctuation so rephrasings of the same words share entries."""
+    return re.sub(r"\s+", " ", prompt.lower()).strip(" .?!")
+
+
+@dataclass
+class SceneEntry:
+    frame_hash: int
+    prompt: str
+    description: str
+    created: float
+
+
+class SceneCache:
+    """
+    Reuses vision descriptions while the scene in front of the camera doesn't change.
+
+    Entries are keyed by (frame hash, prompt). A lookup hits when an entry
+    for the same prompt is younger than ttl seconds and its frame hash is at
+    most threshold bits away from the new frame's, i.e. the camera sees
+    effectively the same scene. The oldest entries are dropped beyond
+    max_entries.
+    """
+
+    def __init__(self, ttl=60.0, threshold=10, max_entries=32, clock=time.monotonic):
+        self.ttl = ttl
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.clock = clock
+        self.entries = []
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self.entries),
+                "threshold": self.threshold,
+                "ttl": self.ttl,
+            }
+
+    def get(self, frame_hash, prompt):
+        """Returns the description of the closest matching scene, or None."""
+        prompt = normalize_prompt(prompt)
+        with self.lock:
+            self._expire()
+            best = None
+            for entry in self.entries:
+                if entry.prompt != prompt:
+                    continue
+                distance = hash_distance(entry.frame_hash, frame_hash)
+                if distance <= self.threshold and (best is None or distance < best[0]):
+                    best = (distance, entry)
+            if best is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return best[1].description
+
+    def put(self, frame_hash, prompt, description):
+        with self.lock:
+            self.entries.append(SceneEntry(frame_hash, normalize_prompt(prompt), description, self.clock()))
+            del self.entries[:-self.max_entries]
+
+    def _expire(self):
+        now = self.clock()
+        self.entries = [entry for entry in self.entries if now - entry.created <= self.ttl]
+
+    def clear(self):
+        with self.lock:
+            self.entries = []
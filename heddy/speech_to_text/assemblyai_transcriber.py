@@ -1,5 +1,11 @@
+import threading
+
 import assemblyai as aai
-from heddy.speech_to_text.stt_manager import STTStatus, STTResult
+from heddy.io.recorded_audio import RecordedAudio
+from heddy.speech_to_text.stt_manager import STTStatus, STTResult, StreamingTranscription
+
+# The real-time API only accepts chunks of 100-2000 ms
+MIN_STREAM_CHUNK_BYTES = 16000 * 2 // 5  # 200 ms of 16 kHz int16 audio
 
 class AssemblyAITranscriber:
     def __init__(self, api_key):
@@ -9,6 +15,9 @@ class AssemblyAITranscriber:
     def transcribe_audio_file(self, audio_file_path):
         # Instantiate the Transcriber object
         transcriber = aai.Transcriber()
+        # In-memory recordings are uploaded straight from a file-like buffer
+        if isinstance(audio_file_path, RecordedAudio):
+            audio_file_path = audio_file_path.as_wav_file()
         # Start the transcription process
         transcript = transcriber.transcribe(audio_file_path)
         
@@ -22,6 +31,95 @@ class AssemblyAITranscriber:
             else STTStatus.SUCCESS
         )
 
+    def start_stream(self):
+        return AssemblyAIStreamingSession(fallback=self.transcribe_audio_file)
+
+
+class AssemblyAIStreamingSession(StreamingTranscription):
+    """
+    Streams the recording to AssemblyAI's real-time websocket while the user speaks.
+
+    The websocket is opened on a background thread so recording starts
+    right away; audio captured in the meantime is sent once it is
+    connected. If it can't connect, the whole recording is transcribed
+    with the batch API (fallback) when recording stops.
+    """
+
+    def __init__(self, sample_rate=16000, fallback=None, connect_timeout=5.0):
+        self.sample_rate = sample_rate
+        self.fallback = fallback
+        self.connect_timeout = connect_timeout
+        self.texts = []
+        self.error = None
+        # Everything recorded, kept for the batch fallback
+        self.audio = bytearray()
+        self.pending = bytearray()
+        self.lock = threading.Lock()
+        self.connected = False
+        self.finished = False
+        self.connect_done = threading.Event()
+        self.transcriber = aai.RealtimeTranscriber(
+            sample_rate=sample_rate,
+            on_data=self._on_data,
+            on_error=self._on_error
+        )
+        threading.Thread(target=self._connect, daemon=True).start()
+
+    def _connect(self):
+        try:
+            self.transcriber.connect()
+        except Exception as e:
+            print(f"Real-time transcription unavailable, falling back to batch: {e}")
+        else:
+            with self.lock:
+                if not self.finished:
+                    self.connected = True
+                    self._send_pending()
+                    return
+            # Connected after finish() gave up and fell back to batch
+            self.transcriber.close()
+        finally:
+            self.connect_done.set()
+
+    def _on_data(self, transcript):
+        if isinstance(transcript, aai.RealtimeFinalTranscript) and transcript.text:
+            self.texts.append(transcript.text)
+
+    def _on_error(self, error):
+        self.error = str(error)
+
+    def feed(self, chunk):
+        with self.lock:
+            self.audio += chunk
+            self.pending += chunk
+            if self.connected:
+                self._send_pending()
+
+    def _send_pending(self):
+        if len(self.pending) >= MIN_STREAM_CHUNK_BYTES:
+            self.transcriber.stream(bytes(self.pending))
+            self.pending = bytearray()
+
+    def finish(self):
+        self.connect_done.wait(self.connect_timeout)
+        with self.lock:
+            connected = self.connected
+            self.finished = True
+        if not connected:
+            if self.fallback is None:
+                return STTResult("", "Could not connect to the real-time API", STTStatus.ERROR)
+            return self.fallback(RecordedAudio(memoryview(bytes(self.audio)), sample_rate=self.sample_rate))
+        if self.pending:
+            # Pad the tail with silence up to the minimum chunk size
+            self.pending += bytes(max(0, MIN_STREAM_CHUNK_BYTES - len(self.pending)))
+            self.transcriber.stream(bytes(self.pending))
+            self.pending = bytearray()
+        # Closing waits for the final transcripts of the audio sent so far
+        self.transcriber.close()
+        if self.error:
+            return STTResult("", self.error, STTStatus.ERROR)
+        return STTResult(" ".join(self.texts), None, STTStatus.SUCCESS)
+
 # The following testing code should be commented out or removed in the integration
 # if __name__ == "__main__":
 #     transcriber = AssemblyAITranscriber(api_key="9c45c5934f8f4dcd9c13c54875145c77")
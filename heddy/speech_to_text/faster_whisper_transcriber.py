@@ -1,6 +1,15 @@
+import threading
+import time
+from queue import Queue
+
+import numpy as np
 from faster_whisper import WhisperModel
 
-from heddy.speech_to_text.stt_manager import STTResult, STTStatus
+from heddy.io.recorded_audio import RecordedAudio, frame_rms
+from heddy.speech_to_text.stt_manager import STTResult, STTStatus, StreamingTranscription
+
+SAMPLE_RATE = 16000
+BYTES_PER_SECOND = SAMPLE_RATE * 2
 
 
 class WhisperTranscriber:
@@ -8,19 +17,77 @@ class WhisperTranscriber:
             self,
             model_size="medium",
             device="cpu",
-            compute_type="int8"
+            compute_type="int8",
+            beam_size=4,
+            cpu_threads=0,
+            num_workers=1,
+            background_load=False
         ) -> None:
-        self.whisper_model = WhisperModel(
-            model_size_or_path=model_size,
-            device=device,
-            compute_type=compute_type
+        self.model_size = model_size
+        self.device = device
+        self.compute_type = compute_type
+        self.beam_size = beam_size
+        self.cpu_threads = cpu_threads
+        self.num_workers = num_workers
+        self._whisper_model = None
+        self.load_error = None
+        self.model_ready = threading.Event()
+        if background_load:
+            threading.Thread(target=self.load_model, daemon=True).start()
+        else:
+            self.load_model()
+
+    def load_model(self):
+        """Loads the model and runs a warm-up inference so the first real request is not slower than the rest."""
+        try:
+            start = time.perf_counter()
+            self._whisper_model = WhisperModel(
+                model_size_or_path=self.model_size,
+                device=self.device,
+                compute_type=self.compute_type,
+                cpu_threads=self.cpu_threads,
+                num_workers=self.num_workers
+            )
+            loaded = time.perf_counter()
+            self.transcribe(np.zeros(SAMPLE_RATE, dtype=np.float32), model=self._whisper_model)
+            print(
+                f"Whisper {self.model_size} loaded in {loaded - start:.2f}s, "
+                f"warmed up in {time.perf_counter() - loaded:.2f}s"
+            )
+        except Exception as e:
+            self.load_error = e
+            print(f"Failed to load Whisper model: {e}")
+        finally:
+            self.model_ready.set()
+
+    @property
+    def whisper_model(self):
+        # Blocks only if a transcription is requested before background loading finished
+        self.model_ready.wait()
+        if self.load_error is not None:
+            raise RuntimeError(f"Whisper model failed to load: {self.load_error}")
+        return self._whisper_model
+
+    def to_model_input(self, audio):
+        """Converts in-memory recordings to the float32 samples faster-whisper decodes directly."""
+        if isinstance(audio, RecordedAudio):
+            audio = audio.pcm
+        if isinstance(audio, (bytes, bytearray, memoryview)):
+            return np.frombuffer(audio, dtype=np.int16).astype(np.float32) / 32768.0
+        return audio
+
+    def transcribe(self, audio, initial_prompt=None, model=None):
+        model = model or self.whisper_model
+        segments, info = model.transcribe(
+            self.to_model_input(audio),
+            beam_size=self.beam_size,
+            initial_prompt=initial_prompt
         )
-    
+        return "".join(segment.text for segment in segments)
+
     def transcribe_audio_file(self, audio_file_path):
         try:
-            segments, info = self.whisper_model.transcribe(audio_file_path, beam_size=4)
-            segments = [segment.text for segment in segments]
-            text = "".join(segments)
+            text = self.transcribe(audio_file_path)
         except Exception as e:
             return STTResult(
                 text="",
@@ -31,4 +98,82 @@ class WhisperTranscriber:
             text=text,
             error="",
             status=STTStatus.SUCCESS
-        )
\ No newline at end of file
+        )
+
+    def start_stream(self):
+        return WhisperStreamingSession(self)
+
+
+class WhisperStreamingSession(StreamingTranscription):
+    """
+    Transcribes a recording segment by segment while it is being captured.
+
+    Incoming 16 kHz int16 audio is cut into segments at pauses in speech (or
+    at max_segment_seconds) and each segment is decoded on a background
+    thread, with the text so far passed as the prompt to keep context. When
+    recording stops only the tail after the last cut is left to decode.
+    """
+
+    def __init__(
+            self,
+            transcriber: WhisperTranscriber,
+            min_segment_seconds=2.0,
+            max_segment_seconds=12.0,
+            pause_seconds=0.4,
+            silence_threshold=500
+        ) -> None:
+        self.transcriber = transcriber
+        self.min_segment_bytes = int(min_segment_seconds * BYTES_PER_SECOND)
+        self.max_segment_bytes = int(max_segment_seconds * BYTES_PER_SECOND)
+        self.pause_bytes = int(pause_seconds * BYTES_PER_SECOND)
+        self.silence_threshold = silence_threshold
+        self.pending = bytearray()
+        self.trailing_silence = 0
+        self.has_speech = False
+        self.texts = []
+        self.error = None
+        self.segments = Queue()
+        self.worker = threading.Thread(target=self._decode_segments, daemon=True)
+        self.worker.start()
+
+    def feed(self, chunk):
+        self.pending += chunk
+        if frame_rms(chunk) < self.silence_threshold:
+            self.trailing_silence += len(chunk)
+        else:
+            self.trailing_silence = 0
+            self.has_speech = True
+        at_pause = len(self.pending) >= self.min_segment_bytes and self.trailing_silence >= self.pause_bytes
+        if at_pause or len(self.pending) >= self.max_segment_bytes:
+            self._cut_segment()
+
+    def _cut_segment(self):
+        # Segments without any speech are dropped, Whisper tends to hallucinate on silence
+        if self.pending and self.has_speech:
+            self.segments.put(bytes(self.pending))
+        self.pending = bytearray()
+        self.trailing_silence = 0
+        self.has_speech = False
+
+    def _decode_segments(self):
+        while True:
+            segment = self.segments.get()
+            if segment is None:
+                return
+            try:
+                prompt = "".join(self.texts) or None
+                self.texts.append(self.transcriber.transcribe(segment, initial_prompt=prompt))
+            except Exception as e:
+                self.error = str(e)
+
+    def finish(self):
+        self._cut_segment()
+        self.segments.put(None)
+        self.worker.join()
+        if self.error:
+            return STTResult(text="", error=self.error, status=STTStatus.ERROR)
+        return STTResult(
+            text="".join(self.texts),
+            error="",
+            status=STTStatus.SUCCESS
+        )
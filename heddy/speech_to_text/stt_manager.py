@@ -1,3 +1,4 @@
+from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from typing import Optional
 from enum import Enum
@@ -14,12 +15,37 @@ class STTResult:
     error: Optional[str]
     status: STTStatus
 
+class StreamingTranscription(ABC):
+    """
+    A transcription that runs while audio is still being captured.
+
+    Audio chunks are passed to feed() as they are recorded; finish() decodes
+    whatever is left and returns the full STTResult.
+    """
+    @abstractmethod
+    def feed(self, chunk: bytes):
+        pass
+
+    @abstractmethod
+    def finish(self) -> STTResult:
+        pass
+
 class STTManager:
     def __init__(self, transcriber) -> None:
         self.transcriber = transcriber
 
+    @property
+    def supports_streaming(self):
+        return hasattr(self.transcriber, "start_stream")
+
+    def start_stream(self) -> StreamingTranscription:
+        return self.transcriber.start_stream()
+
     def transcribe_audio_file(self, event: ApplicationEvent):
-        result: STTResult = self.transcriber.transcribe_audio_file(event.request)
+        if isinstance(event.request, StreamingTranscription):
+            result: STTResult = event.request.finish()
+        else:
+            result: STTResult = self.transcriber.transcribe_audio_file(event.request)
         if result.status == STTStatus.SUCCESS:
             event.result = result.text
             event.status = ProcessingStatus.SUCCESS
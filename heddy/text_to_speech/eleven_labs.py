@@ -1,29 +1,57 @@
-import requests
-from heddy.text_to_speech.text_to_speach_manager import TTSStatus, TTSResult
+from heddy.http_session import http_sessions
+from heddy.text_to_speech.text_to_speach_manager import PCMAudio, TTSStatus, TTSResult
+from heddy.text_to_speech.tts_cache import make_cache_key
 
 
 class ElevenLabsManager:
-    def __init__(self, api_key):
+    def __init__(self, api_key, output_format="pcm_22050", optimize_streaming_latency=0, chunk_size=4096):
         self.api_key = api_key
         self.voice_id = "RXZFrCz94YM9cSj7aieu"
         self.model_id = "eleven_turbo_v2"
         self.url = f"https://api.elevenlabs.io/v1/text-to-speech/{self.voice_id}/stream"
+        self.output_format = output_format
+        self.optimize_streaming_latency = optimize_streaming_latency
+        self.chunk_size = chunk_size
+        self.voice_settings = {
+            "similarity_boost": 1.0,
+            "stability": 1.0,
+            "style": 1.0,
+            "use_speaker_boost": True
+        }
+
+    def cache_key(self, text):
+        """Identifies the audio this manager would produce for text, for TTSCache."""
+        return make_cache_key(
+            voice_id=self.voice_id,
+            model_id=self.model_id,
+            voice_settings=self.voice_settings,
+            output_format=self.output_format,
+            text=text
+        )
+
+    @property
+    def streams_pcm(self):
+        return self.output_format.startswith("pcm_")
+
+    def _iter_audio(self, response):
+        """Yields the response body as it arrives and releases the connection afterwards."""
+        try:
+            for chunk in response.iter_content(chunk_size=self.chunk_size):
+                if chunk:
+                    yield chunk
+        finally:
+            response.close()
 
     def __call__(self, text):
         query_params = {
-            "optimize_streaming_latency": 0,
-            "output_format": "mp3_44100_128"
+            "optimize_streaming_latency": self.optimize_streaming_latency,
+            "output_format": self.output_format
         }
 
         payload = {
             "model_id": self.model_id,
             "text": text,
-            "voice_settings": {
-                "similarity_boost": 1.0,
-                "stability": 1.0,
-                "style": 1.0,
-                "use_speaker_boost": True
-            }
+            "voice_settings": self.voice_settings
         }
 
         headers = {
@@ -31,11 +59,20 @@ class ElevenLabsManager:
             "Xi-Api-Key": self.api_key
         }
 
-        response = requests.post(self.url, params=query_params, json=payload, headers=headers)
+        # With PCM output the body is played while it downloads, so only wait for the headers here
+        response = http_sessions.session.post(self.url, params=query_params, json=payload, headers=headers, stream=self.streams_pcm)
 
         if response.status_code != 200:
             return TTSResult(status=TTSStatus.ERROR, error=response.text)
+        if self.streams_pcm:
+            return TTSResult(
+                status=TTSStatus.SUCCESS,
+                audio=PCMAudio(
+                    chunks=self._iter_audio(response),
+                    sample_rate=int(self.output_format.split("_")[1])
+                )
+            )
         return TTSResult(
             status=TTSStatus.SUCCESS,
             audio=response.content
-        )
\ No newline at end of file
+        )
@@ -0,0 +1,72 @@
+import shutil
+import struct
+import subprocess
+
+from heddy.text_to_speech.text_to_speach_manager import PCMAudio, TTSStatus, TTSResult
+from heddy.text_to_speech.tts_cache import make_cache_key
+
+WAV_HEADER_BYTES = 44
+
+
+class EspeakTTS:
+    """
+    Local, offline synthesizer backed by the espeak-ng command line tool.
+
+    Audio is read from espeak-ng's stdout while it is being generated, so
+    playback can start before the whole sentence is synthesized.
+    """
+
+    def __init__(self, voice="en-us", words_per_minute=175, executable="espeak-ng", chunk_size=4096):
+        self.voice = voice
+        self.words_per_minute = words_per_minute
+        self.executable = executable
+        self.chunk_size = chunk_size
+
+    @staticmethod
+    def available(executable="espeak-ng"):
+        return shutil.which(executable) is not None
+
+    def cache_key(self, text):
+        return make_cache_key(
+            engine=self.executable,
+            voice=self.voice,
+            words_per_minute=self.words_per_minute,
+            text=text
+        )
+
+    def _iter_audio(self, process):
+        try:
+            while True:
+                chunk = process.stdout.read(self.chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            process.stdout.close()
+            process.wait()
+
+    def __call__(self, text):
+        command = [self.executable, "-v", self.voice, "-s", str(self.words_per_minute), "--stdout"]
+        try:
+            process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+            # Text goes through stdin so it can never be mistaken for an option
+            process.stdin.write(text.encode("utf-8"))
+            process.stdin.close()
+        except OSError as e:
+            return TTSResult(status=TTSStatus.ERROR, error=str(e))
+
+        # espeak-ng writes a WAV header first, the sample rate sits at byte 24
+        header = process.stdout.read(WAV_HEADER_BYTES)
+        if len(header) < WAV_HEADER_BYTES or header[:4] != b"RIFF":
+            process.wait()
+            return TTSResult(status=TTSStatus.ERROR, error=f"{self.executable} exited with {process.returncode} without audio")
+        sample_rate, = struct.unpack("<I", header[24:28])
+        channels, = struct.unpack("<H", header[22:24])
+        return TTSResult(
+            status=TTSStatus.SUCCESS,
+            audio=PCMAudio(
+                chunks=self._iter_audio(process),
+                sample_rate=sample_rate,
+                channels=channels
+            )
+        )
@@ -0,0 +1,181 @@
+import re
+import threading
+from queue import Queue
+
+from heddy.application_event import ApplicationEvent, ApplicationEventType, ProcessingStatus
+from heddy.text_to_speech.text_to_speach_manager import TTSStatus, discard_audio
+from heddy.tracing import tracer
+
+# A sentence ends on terminal punctuation (optionally followed by closing
+# quotes/brackets) and whitespace, or on a line break.
+SENTENCE_END = re.compile(r'[.!?…]+["\')\]]*\s+|\n+')
+CLAUSE_END = re.compile(r'[,;:—]\s+')
+
+# Marks the end of a turn as it moves through the queues
+_END_OF_TURN = object()
+
+
+class SentenceChunker:
+    """Splits streamed text deltas into speakable sentences or clauses."""
+
+    def __init__(self, min_chars=12, max_chars=180):
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self.buffer = ""
+
+    def feed(self, delta):
+        """
+        Add a text delta and return every chunk that is ready to be spoken.
+
+        Args:
+        delta (str): The next piece of streamed assistant text.
+        """
+        self.buffer += delta
+        chunks = []
+        chunk = self._next_chunk()
+        while chunk is not None:
+            if chunk:
+                chunks.append(chunk)
+            chunk = self._next_chunk()
+        return chunks
+
+    def flush(self):
+        """Return whatever text is left over at the end of a response."""
+        chunk = self.buffer.strip()
+        self.buffer = ""
+        return [chunk] if chunk else []
+
+    def _next_chunk(self):
+        # Prefer the first sentence boundary that gives a long enough chunk,
+        # so very short fragments ("Sure.") get merged with the next sentence.
+        for match in SENTENCE_END.finditer(self.buffer):
+            if match.end() >= self.min_chars:
+                return self._cut(match.end())
+        if len(self.buffer) <= self.max_chars:
+            return None
+        # No sentence end in sight, fall back to the last clause boundary
+        # (or whitespace) so long run-on sentences still start playing early.
+        head = self.buffer[:self.max_chars]
+        clauses = list(CLAUSE_END.finditer(head))
+        if clauses:
+            return self._cut(clauses[-1].end())
+        space = head.rfind(" ")
+        return self._cut(space + 1 if space > 0 else self.max_chars)
+
+    def _cut(self, index):
+        chunk, self.buffer = self.buffer[:index], self.buffer[index:]
+        return chunk.strip()
+
+
+class StreamingTTSPipeline:
+    """
+    Speaks assistant responses while they are still being generated.
+
+    Text deltas are split into sentences, each sentence is synthesized by a
+    worker thread and the resulting audio is handed to a playback thread, so
+    synthesis of the next sentence overlaps playback of the current one.
+
+    Streamed audio keeps its HTTP request open until it has been played, so
+    at most max_lookahead sentences are synthesized ahead of the one that is
+    playing; otherwise a long answer would open one idle request per
+    sentence and run into the API's concurrency limit.
+    """
+
+    def __init__(self, tts_manager, audio_player, chunker_factory=SentenceChunker, max_lookahead=1):
+        self.tts_manager = tts_manager
+        self.audio_player = audio_player
+        self.chunker_factory = chunker_factory
+        self.chunker = chunker_factory()
+        self.text_queue = Queue()
+        self.audio_queue = Queue()
+        # One slot per audio item that is queued but not yet taken up by the playback worker
+        self.lookahead = threading.Semaphore(max_lookahead)
+        self.turn_complete = threading.Event()
+        self.turn_complete.set()
+        self.workers = []
+        # Queued items are tagged with the generation they belong to; cancel()
+        # bumps it so anything still in flight is dropped instead of played
+        self.generation = 0
+
+    def _ensure_workers(self):
+        if self.workers:
+            return
+        self.workers = [
+            threading.Thread(target=self._synthesize_worker, daemon=True),
+            threading.Thread(target=self._playback_worker, daemon=True),
+        ]
+        for worker in self.workers:
+            worker.start()
+
+    def start(self):
+        """Prepares the pipeline for a new assistant response."""
+        self._ensure_workers()
+        self.chunker = self.chunker_factory()
+        self.turn_complete.clear()
+        self.audio_player.resume()
+
+    def feed(self, delta):
+        """Queues every complete sentence contained in the new delta for synthesis."""
+        for chunk in self.chunker.feed(delta):
+            self.text_queue.put((self.generation, chunk))
+
+    def finish(self):
+        """Flushes the remaining text and marks the end of the response."""
+        for chunk in self.chunker.flush():
+            self.text_queue.put((self.generation, chunk))
+        self.text_queue.put((self.generation, _END_OF_TURN))
+
+    def cancel(self):
+        """Drops all pending text and audio of the current response and stops playback."""
+        self.generation += 1
+        self.chunker = self.chunker_factory()
+        self.audio_player.stop()
+        self.turn_complete.set()
+
+    def wait(self, event: ApplicationEvent):
+        """Blocks until everything queued for the current response has been played."""
+        self.turn_complete.wait()
+        event.status = ProcessingStatus.SUCCESS
+        return event
+
+    def _synthesize_worker(self):
+        while True:
+            generation, text = self.text_queue.get()
+            if generation != self.generation:
+                continue
+            # Waits until the previous sentence has started playing
+            self.lookahead.acquire()
+            if text is _END_OF_TURN:
+                self.audio_queue.put((generation, _END_OF_TURN))
+                continue
+            if generation != self.generation:
+                # Cancelled while waiting
+                self.lookahead.release()
+                continue
+            print(f"Synthesizing: '{text}'")
+            with tracer.span("tts_chunk", chars=len(text)):
+                result = self.tts_manager.synthesize_text(text)
+            if result.status != TTSStatus.SUCCESS:
+                print(f"Failed to synthesize '{text}': {result.error}")
+                self.lookahead.release()
+                continue
+            self.audio_queue.put((generation, result.audio))
+
+    def _playback_worker(self):
+        while True:
+            generation, audio = self.audio_queue.get()
+            self.lookahead.release()
+            if generation != self.generation:
+                discard_audio(audio)
+                continue
+            if audio is _END_OF_TURN:
+                self.turn_complete.set()
+                continue
+            try:
+                with tracer.span("play_chunk"):
+                    self.audio_player.play(ApplicationEvent(
+                        type=ApplicationEventType.PLAY,
+                        request=audio
+                    ))
+            except Exception as e:
+                print(f"Failed to play audio chunk: {e}")
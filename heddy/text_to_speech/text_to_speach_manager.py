@@ -1,25 +1,96 @@
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
 from dataclasses import dataclass
 from enum import Enum
-from typing import Optional
+from typing import Iterable, Optional, Union
 from heddy.application_event import ApplicationEvent, ApplicationEventType, ProcessingStatus
 
 class TTSStatus(Enum):
     SUCCESS = 1
     ERROR = -1
 
+@dataclass
+class PCMAudio:
+    """Raw little-endian PCM audio, delivered as an iterable of byte chunks."""
+    chunks: Iterable[bytes]
+    sample_rate: int
+    channels: int = 1
+    sample_width: int = 2
+
 @dataclass
 class TTSResult:
-    # TODO: change to generic audio type so we could play different formats
+    # audio is either an encoded file (e.g. mp3 bytes) or streamed raw PCM
     status: TTSStatus
-    audio: Optional[bytes] = None
+    audio: Optional[Union[bytes, PCMAudio]] = None
     error: Optional[str] = None
     
+def discard_audio(audio):
+    """Releases a streamed result that will not be played (closing its connection or process)."""
+    if isinstance(audio, PCMAudio) and hasattr(audio.chunks, "close"):
+        audio.chunks.close()
+
 class TTSManager:
-    def __init__(self, synthesizer):
+    def __init__(self, synthesizer, cache=None, max_cached_chars=200, fallback=None, latency_budget=None):
         self.synthesizer = synthesizer
-    
+        # Optional TTSCache; only texts up to max_cached_chars are cached,
+        # long answers are rarely repeated word for word
+        self.cache = cache
+        self.max_cached_chars = max_cached_chars
+        # Optional local synthesizer used when the primary one fails or does
+        # not start returning audio within latency_budget seconds
+        self.fallback = fallback
+        self.latency_budget = latency_budget
+        self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="tts") if fallback and latency_budget else None
+
+    def _synthesize_primary(self, text) -> TTSResult:
+        if self.executor is None:
+            try:
+                return self.synthesizer(text)
+            except Exception as e:
+                return TTSResult(status=TTSStatus.ERROR, error=str(e))
+        future = self.executor.submit(self.synthesizer, text)
+        try:
+            return future.result(timeout=self.latency_budget)
+        except TimeoutError:
+            # Let the slow request finish in the background and throw its audio away
+            future.add_done_callback(lambda done: done.exception() or discard_audio(done.result().audio))
+            return TTSResult(status=TTSStatus.ERROR, error=f"No audio within {self.latency_budget}s")
+        except Exception as e:
+            return TTSResult(status=TTSStatus.ERROR, error=str(e))
+
+    def synthesize_text(self, text) -> TTSResult:
+        use_cache = self.cache is not None and len(text) <= self.max_cached_chars
+        if use_cache:
+            key = self.synthesizer.cache_key(text)
+            audio = self.cache.get(key)
+            if audio is not None:
+                return TTSResult(status=TTSStatus.SUCCESS, audio=audio)
+
+        result = self._synthesize_primary(text)
+        if result.status != TTSStatus.SUCCESS and self.fallback is not None:
+            print(f"Primary synthesizer failed ({result.error}), using fallback.")
+            # Fallback audio is not cached under the primary synthesizer's key
+            return self.fallback(text)
+
+        if use_cache and result.status == TTSStatus.SUCCESS:
+            if isinstance(result.audio, PCMAudio):
+                result.audio = self.cache.caching_stream(key, result.audio)
+            else:
+                self.cache.put(key, result.audio)
+        return result
+
+    def prefetch(self, phrases):
+        """Synthesizes and caches phrases that are known to come up, e.g. the greeting."""
+        for text in phrases:
+            result = self.synthesize_text(text)
+            if result.status != TTSStatus.SUCCESS:
+                print(f"Failed to prefetch '{text}': {result.error}")
+            elif isinstance(result.audio, PCMAudio):
+                # Draining the stream is what stores it in the cache
+                for _ in result.audio.chunks:
+                    pass
+
     def synthesize(self, event: ApplicationEvent):
-        result: TTSResult = self.synthesizer(event.request)
+        result: TTSResult = self.synthesize_text(event.request)
 
         if result.status == TTSStatus.SUCCESS:
             event.result = result.audio
@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+import threading
+import wave
+from collections import OrderedDict
+
+from heddy.text_to_speech.text_to_speach_manager import PCMAudio
+
+
+def make_cache_key(**fields):
+    """Content address for synthesized audio: a hash over everything that affects the output."""
+    return hashlib.sha256(json.dumps(fields, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    """
+    Two-tier cache of synthesized audio.
+
+    Entries live in an in-memory LRU bounded by entry count and bytes, and
+    optionally in a directory on disk that is evicted least-recently-used
+    first once it grows past max_disk_bytes. PCM audio is stored as WAV so
+    the format travels with it; encoded audio (e.g. mp3) is stored as is.
+    """
+
+    def __init__(self, max_entries=128, max_memory_bytes=32 * 1024 * 1024, disk_dir=None, max_disk_bytes=256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_memory_bytes = max_memory_bytes
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.entries = OrderedDict()
+        self.memory_bytes = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self.entries),
+                "memory_bytes": self.memory_bytes,
+            }
+
+    def get(self, key):
+        """Returns the cached audio for key (bytes or PCMAudio), or None."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self._to_audio(entry)
+        entry = self._read_disk(key)
+        with self.lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._remember(key, entry)
+        return self._to_audio(entry)
+
+    def put(self, key, audio):
+        """Stores fully synthesized audio (bytes, or a PCMAudio whose chunks are a list)."""
+        if isinstance(audio, PCMAudio):
+            entry = (b"".join(audio.chunks), (audio.sample_rate, audio.channels, audio.sample_width))
+        else:
+            entry = (bytes(audio), None)
+        with self.lock:
+            self._remember(key, entry)
+        self._write_disk(key, entry)
+
+    def caching_stream(self, key, audio: PCMAudio):
+        """Wraps streamed PCM so it is cached once it has been played through completely."""
+        def chunks():
+            received = []
+            for chunk in audio.chunks:
+                received.append(chunk)
+                yield chunk
+            self.put(key, PCMAudio(received, audio.sample_rate, audio.channels, audio.sample_width))
+        return PCMAudio(chunks(), audio.sample_rate, audio.channels, audio.sample_width)
+
+    def _to_audio(self, entry):
+        data, pcm_format = entry
+        if pcm_format is None:
+            return data
+        sample_rate, channels, sample_width = pcm_format
+        return PCMAudio([data], sample_rate, channels, sample_width)
+
+    def _remember(self, key, entry):
+        if key in self.entries:
+            self.memory_bytes -= len(self.entries.pop(key)[0])
+        self.entries[key] = entry
+        self.memory_bytes += len(entry[0])
+        while self.entries and (len(self.entries) > self.max_entries or self.memory_bytes > self.max_memory_bytes):
+            _, evicted = self.entries.popitem(last=False)
+            self.memory_bytes -= len(evicted[0])
+
+    def _disk_path(self, key, pcm):
+        return os.path.join(self.disk_dir, f"{key}.{'wav' if pcm else 'bin'}")
+
+    def _read_disk(self, key):
+        if not self.disk_dir:
+            return None
+        for pcm in (True, False):
+            path = self._disk_path(key, pcm)
+            if not os.path.exists(path):
+                continue
+            try:
+                # Touch the file so disk eviction is least-recently-used
+                os.utime(path)
+                if not pcm:
+                    with open(path, "rb") as f:
+                        return f.read(), None
+                with wave.open(path, "rb") as wf:
+                    pcm_format = (wf.getframerate(), wf.getnchannels(), wf.getsampwidth())
+                    return wf.readframes(wf.getnframes()), pcm_format
+            except (OSError, wave.Error) as e:
+                print(f"Failed to read cached audio {path}: {e}")
+        return None
+
+    def _write_disk(self, key, entry):
+        if not self.disk_dir:
+            return
+        data, pcm_format = entry
+        path = self._disk_path(key, pcm_format is not None)
+        try:
+            if pcm_format is None:
+                with open(path, "wb") as f:
+                    f.write(data)
+            else:
+                sample_rate, channels, sample_width = pcm_format
+                with wave.open(path, "wb") as wf:
+                    wf.setnchannels(channels)
+                    wf.setsampwidth(sample_width)
+                    wf.setframerate(sample_rate)
+                    wf.writeframes(data)
+        except (OSError, wave.Error) as e:
+            print(f"Failed to write cached audio {path}: {e}")
+            return
+        self._evict_disk()
+
+    def _evict_disk(self):
+        files = []
+        for name in os.listdir(self.disk_dir):
+            path = os.path.join(self.disk_dir, name)
+            if os.path.isfile(path):
+                stat = os.stat(path)
+                files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
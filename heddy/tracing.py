@@ -0,0 +1,224 @@
+import atexit
+import json
+import math
+import queue
+import socket
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+@dataclass
+class Span:
+    name: str
+    turn: int
+    # Wall-clock start in seconds since the epoch
+    start: float
+    duration: float
+    device: str = ""
+    attributes: dict = field(default_factory=dict)
+
+
+def percentile(sorted_values, quantile):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(quantile * len(sorted_values))
+    return sorted_values[min(len(sorted_values), max(rank, 1)) - 1]
+
+
+class Tracer:
+    """
+    Records how long each pipeline stage takes, grouped by conversation turn.
+
+    Spans are kept in memory for percentile summaries (the most recent
+    max_samples per stage) and, once a trace file is configured, appended
+    to it as JSON lines by a background writer, so recording a span never
+    waits for the disk. summary() and prometheus_text() report p50/p95/p99
+    per stage; serve_metrics() exposes the latter over HTTP.
+    """
+
+    def __init__(self, jsonl_path=None, device=None, max_samples=1000):
+        self.jsonl_path = jsonl_path
+        self.device = device or socket.gethostname()
+        self.max_samples = max_samples
+        self.turn = 0
+        self.durations = defaultdict(lambda: deque(maxlen=self.max_samples))
+        self.totals = defaultdict(lambda: [0, 0.0])
+        self.lock = threading.Lock()
+        # perf_counter is used for durations, this maps it back to wall-clock time
+        self.epoch_offset = time.time() - time.perf_counter()
+        self.server = None
+        self.pending = queue.Queue()
+        self.writer = None
+        # name -> callable returning a dict of numbers, e.g. cache hit counters
+        self.gauge_sources = {}
+
+    def configure(self, **kwargs):
+        for key, value in kwargs.items():
+            if not hasattr(self, key):
+                raise TypeError(f"Unknown tracer option: {key}")
+            setattr(self, key, value)
+
+    def start_turn(self):
+        """Starts a new conversation turn; spans recorded from now on are tagged with it."""
+        with self.lock:
+            self.turn += 1
+            return self.turn
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """
+        Times the enclosed block as one span.
+
+        Args:
+        name (str): The stage name, e.g. "TRANSCRIBE".
+        attributes: Extra fields stored with the span; the yielded dict can be updated inside the block.
+        """
+        start = time.perf_counter()
+        try:
+            yield attributes
+        finally:
+            self.record(name, start, **attributes)
+
+    def record(self, name, start, end=None, **attributes):
+        """
+        Records a span that began at the perf_counter value start and ends at end (default: now).
+
+        Args:
+        name (str): The stage name.
+        start (float): time.perf_counter() at the beginning of the stage.
+        end (float): time.perf_counter() at the end of the stage.
+        """
+        end = time.perf_counter() if end is None else end
+        span = Span(
+            name=name,
+            turn=self.turn,
+            start=self.epoch_offset + start,
+            duration=end - start,
+            device=self.device,
+            attributes=attributes
+        )
+        with self.lock:
+            self.durations[name].append(span.duration)
+            totals = self.totals[name]
+            totals[0] += 1
+            totals[1] += span.duration
+        if self.jsonl_path:
+            self._start_writer()
+            self.pending.put(span)
+        return span
+
+    def observe(self, name, duration, **attributes):
+        """Records a measured duration (e.g. time saved) as a span ending now."""
+        end = time.perf_counter()
+        return self.record(name, end - duration, end, **attributes)
+
+    def _start_writer(self):
+        with self.lock:
+            if self.writer is not None:
+                return
+            self.writer = threading.Thread(target=self._write_spans, daemon=True)
+            self.writer.start()
+        # Spans still queued at exit are written out first
+        atexit.register(self.flush)
+
+    def _write_spans(self):
+        while True:
+            spans = [self.pending.get()]
+            # Write whatever queued up meanwhile in one go
+            while True:
+                try:
+                    spans.append(self.pending.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with open(self.jsonl_path, "a") as f:
+                    f.writelines(json.dumps(asdict(span), default=str) + "\n" for span in spans)
+            except OSError as e:
+                print(f"Failed to write trace to {self.jsonl_path}: {e}")
+            finally:
+                for _ in spans:
+                    self.pending.task_done()
+
+    def flush(self):
+        """Waits until every recorded span has been written to the trace file."""
+        if self.writer is not None:
+            self.pending.join()
+
+    def add_gauges(self, name, source):
+        """
+        Exports the numbers returned by source() alongside the stage durations.
+
+        Args:
+        name (str): Metric prefix, e.g. "tts_cache".
+        source (callable): Returns a dict of counter/gauge values, e.g. TTSCache.stats.
+        """
+        self.gauge_sources[name] = source
+
+    def gauges(self):
+        """Returns the current values of every registered gauge source."""
+        return {name: source() for name, source in list(self.gauge_sources.items())}
+
+    def summary(self):
+        """Returns count, sum and p50/p95/p99 durations in seconds for every stage."""
+        with self.lock:
+            stages = {name: (sorted(values), list(self.totals[name])) for name, values in self.durations.items()}
+        return {
+            name: {
+                "count": count,
+                "sum": total,
+                **{f"p{int(q * 100)}": percentile(values, q) for q in QUANTILES},
+            }
+            for name, (values, (count, total)) in stages.items()
+        }
+
+    def prometheus_text(self):
+        """Renders the stage summaries in the Prometheus text exposition format."""
+        lines = [
+            "# HELP heddy_stage_duration_seconds Duration of voice pipeline stages.",
+            "# TYPE heddy_stage_duration_seconds summary",
+        ]
+        for name, stats in sorted(self.summary().items()):
+            labels = f'stage="{name}",device="{self.device}"'
+            for q in QUANTILES:
+                lines.append(f'heddy_stage_duration_seconds{{{labels},quantile="{q}"}} {stats[f"p{int(q * 100)}"]:.6f}')
+            lines.append(f"heddy_stage_duration_seconds_sum{{{labels}}} {stats['sum']:.6f}")
+            lines.append(f"heddy_stage_duration_seconds_count{{{labels}}} {stats['count']}")
+        for name, values in sorted(self.gauges().items()):
+            for key, value in sorted(values.items()):
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    lines.append(f'heddy_{name}_{key}{{device="{self.device}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def serve_metrics(self, port, host="127.0.0.1"):
+        """Serves prometheus_text() at /metrics on a background thread."""
+        tracer = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = tracer.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        print(f"Serving metrics on http://{host}:{self.server.server_port}/metrics")
+        return self.server
+
+# Global instance shared by all pipeline stages
+tracer = Tracer()
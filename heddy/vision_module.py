@@ -1,99 +1,263 @@
 import subprocess
-import os
 import base64
-import uuid
 import threading
+import time
+import json
+from concurrent.futures import Future
+from dataclasses import dataclass, field
 import requests
+from heddy.http_session import http_sessions
+from heddy.image_preprocessing import ImageSettings, difference_hash, preprocess_image
+from heddy.tracing import tracer
 
 image_description = ""
 
+@dataclass
+class ImagePrompt:
+    """A user message together with the snapshot it refers to, sent to the assistant as multimodal content."""
+    text: str
+    base64_image: str = field(repr=False)
+    mime_type: str = "image/jpeg"
+    detail: str = "low"
+
+    @property
+    def data_url(self):
+        return f"data:{self.mime_type};base64,{self.base64_image}"
+
+@dataclass
+class Description:
+    """Result of a description request."""
+    text: str
+    # Whether the text already went to on_token while streaming
+    streamed: bool = False
+    # False if the stream broke off before [DONE]; such text is not cached
+    complete: bool = True
+
+def read_sse_tokens(response):
+    """Yields the content deltas of a streamed chat completion (server-sent events) as they arrive."""
+    # chunk_size=None hands over data as soon as it is received instead of filling a buffer first
+    for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+        if not line or not line.startswith("data:"):
+            continue
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            return
+        choices = json.loads(data).get("choices") or []
+        if choices:
+            token = choices[0].get("delta", {}).get("content")
+            if token:
+                yield token
+    raise ValueError("stream ended before [DONE]")
+
 def process_image(image_path):
     global image_description
     # Your existing code to process the image and generate the description
     image_description = generated_description
 
 class VisionModule:
-    def __init__(self, openai_api_key):
+    def __init__(self, openai_api_key, image_settings=None, camera=None, scene_cache=None,
+                 api_url="https://api.openai.com/v1/chat/completions"):
         self.api_key = openai_api_key
-        self.capture_complete = threading.Event()
+        self.api_url = api_url
+        self.image_settings = image_settings or ImageSettings()
+        # A started CameraService; without one every snapshot runs fswebcam
+        self.camera = camera
+        # Optional SceneCache that reuses descriptions of an unchanged scene
+        self.scene_cache = scene_cache
+        # Future of the capture started by capture_image_async until a snapshot takes it.
+        # Snapshots are otherwise kept local, so concurrent tool calls each get their own.
+        self.pending_capture = None
+        self.capture_lock = threading.Lock()
 
     def capture_image_async(self):
-        """Initiates the image capture process in a new thread."""
-        self.capture_complete.clear()  # Reset the event for the new capture process
-        thread = threading.Thread(target=self.capture_image)
-        thread.start()
+        """Starts capturing and encoding an image in a new thread, e.g. while the user is still speaking."""
+        capture = Future()
+        with self.capture_lock:
+            self.pending_capture = capture
+
+        def capture_in_background():
+            snapshot = (None, None)
+            try:
+                snapshot = self.capture_and_encode()
+            finally:
+                # Unblock the waiting snapshot even if capturing failed
+                capture.set_result(snapshot)
+
+        threading.Thread(target=capture_in_background, daemon=True).start()
+
+    def capture_and_encode(self):
+        """Captures an image and returns it base64-encoded with its perceptual hash, or (None, None) on failure."""
+        with tracer.span("capture"):
+            frame = self.capture_image()
+        if not frame:
+            return None, None
+        return self.encode_image(frame)
 
     def capture_image(self):
-        """Captures an image using fswebcam and saves it as a PNG file."""
-        image_file_name = f"{uuid.uuid4()}.png"
-        self.image_path = f"/tmp/{image_file_name}"
+        """
+        Captures an image, returning it (or None on failure) without touching the disk.
+
+        With a camera service this is the newest frame as a PIL image,
+        otherwise the PNG bytes written by fswebcam.
+        """
         print("Taking picture now...")
-        capture_command = f"fswebcam --no-banner --resolution 1280x720 --save {self.image_path} -d /dev/video0 -r 1280x720 --png 1"
+        if self.camera is not None:
+            frame = self.camera.latest_frame()
+            if frame is None:
+                print("Failed to capture image: no frame from the camera service")
+                return None
+            return frame.to_image()
+        # "--save -" writes the image to stdout
+        capture_command = "fswebcam --no-banner --resolution 1280x720 --save - -d /dev/video0 -r 1280x720 --png 1"
 
         try:
-            subprocess.check_call(capture_command.split())
-            print(f"Image captured successfully: {self.image_path}")
-            self.capture_complete.set()  # Signal that the capture has completed
-        except subprocess.CalledProcessError as e:
+            frame = subprocess.run(capture_command.split(), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True).stdout
+            print(f"Image captured successfully: {len(frame)} bytes")
+            return frame
+        except (subprocess.CalledProcessError, OSError) as e:
             print(f"Failed to capture image: {e}")
-            self.image_path = None  # Ensure path is reset on failure
-            self.capture_complete.set()  # Signal to unblock any waiting process, even though capture failed
-
-    def encode_image_to_base64(self):
-        """Encodes the captured image to a base64 string."""
-        if self.image_path and os.path.exists(self.image_path):
-            with open(self.image_path, "rb") as image_file:
-                return base64.b64encode(image_file.read()).decode('utf-8')
-        else:
-            print("No image file found or image capture failed.")
-        return None
+            return None
+
+    def encode_image(self, frame):
+        """
+        Downsamples and recompresses a frame according to image_settings and base64-encodes it.
+
+        Returns the encoded image and its perceptual hash (None without a scene cache).
+        """
+        with tracer.span("encode", setting=self.image_settings.label) as attributes:
+            data = preprocess_image(frame, self.image_settings)
+            attributes.update(bytes=len(data))
+            frame_hash = None
+            if self.scene_cache is not None:
+                # Hashing the downsampled image is cheaper and just as stable
+                frame_hash = difference_hash(data)
+            return base64.b64encode(data).decode('utf-8'), frame_hash
 
     def get_image_description(self, transcription, base64_image):
         """Sends the base64-encoded image along with the transcription to the OpenAI API and returns the description."""
         if base64_image:
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {self.api_key}"
-            }
-
-            payload = {
-                "model": "gpt-4-vision-preview",
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": transcription},  # Use transcription as the prompt
-                            {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{base64_image}"}}
-                        ]
-                    }
-                ],
-                "max_tokens": 300
-            }
-
-            response = requests.post("https://api.openai.com/v1/chat/completions", headers=headers, json=payload)
-            if response.status_code == 200:
-                try:
-                    return response.json()['choices'][0]['message']['content']
-                except KeyError:
-                    return "Description not available or wrong response format."
-            else:
-                print(f"Error in OpenAI API call: {response.text}")
+            description = self.request_description(transcription, base64_image)
+            if description is not None:
+                return description.text
+            return "Description not available or wrong response format."
         return "Failed to encode image or image capture failed."
 
-    def describe_captured_image(self, transcription="What's in this image?"):
-        """Ensures the image capture has completed, then encodes and sends it along with the transcription to the OpenAI API for a description."""
-        self.capture_complete.wait()  # Wait for the image capture to complete
-        base64_image = self.encode_image_to_base64()
-        if base64_image:
-            description = self.get_image_description(transcription, base64_image)
-            print(f"Sending image description request...")
-            # Cleanup
-            if self.image_path and os.path.exists(self.image_path):
-                os.remove(self.image_path)
-            return description
-        else:
-            return "Image processing failed."
-    
+    def request_description(self, transcription, base64_image, on_token=None):
+        """
+        Streams the vision model's description of the image and returns it as a Description, or None if nothing arrived.
+
+        Args:
+        transcription (str): The user's question, used as the prompt.
+        base64_image (str): The encoded snapshot.
+        on_token (callable): Called with each piece of the description as it arrives, e.g. to speak it.
+        """
+        if not base64_image:
+            return None
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.api_key}"
+        }
+
+        payload = {
+            "model": "gpt-4-vision-preview",
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": transcription},  # Use transcription as the prompt
+                        {"type": "image_url", "image_url": {
+                            "url": f"data:{self.image_settings.mime_type};base64,{base64_image}",
+                            "detail": self.image_settings.detail
+                        }}
+                    ]
+                }
+            ],
+            "max_tokens": 300,
+            "stream": True
+        }
+
+        start = time.perf_counter()
+        first_token = None
+        text = ""
+        complete = False
+        try:
+            with http_sessions.session.post(self.api_url, headers=headers, json=payload, stream=True) as response:
+                if response.status_code != 200:
+                    print(f"Error in OpenAI API call: {response.text}")
+                    return None
+                for token in read_sse_tokens(response):
+                    if first_token is None:
+                        first_token = time.perf_counter()
+                        tracer.record("vision_first_token", start, first_token, setting=self.image_settings.label)
+                    text += token
+                    if on_token:
+                        on_token(token)
+            complete = True
+        except (requests.RequestException, ValueError) as e:
+            # Whatever already arrived (and may have been spoken) is still the answer
+            print(f"Vision stream failed: {e}")
+        # Base64 inflates the image by a third; this is what actually goes over the wire
+        tracer.record("vision_request", start, setting=self.image_settings.label, bytes=len(base64_image))
+        if not text:
+            return None
+        return Description(text, streamed=True, complete=complete)
+
+    def get_encoded_image(self):
+        """Returns the base64-encoded snapshot, reusing the capture started at USE_SNAPSHOT if there is one."""
+        return self.get_snapshot()[0]
+
+    def get_snapshot(self):
+        """Like get_encoded_image, but also returns the frame's perceptual hash (None without a scene cache)."""
+        with self.capture_lock:
+            capture, self.pending_capture = self.pending_capture, None
+        if capture is None:
+            return self.capture_and_encode()
+        # Wait for the capture started at USE_SNAPSHOT
+        return capture.result()
+
+    def get_image_prompt(self, transcription):
+        """Bundles the transcription with the snapshot, or returns None if capturing failed."""
+        base64_image = self.get_encoded_image()
+        if not base64_image:
+            return None
+        return ImagePrompt(
+            text=transcription,
+            base64_image=base64_image,
+            mime_type=self.image_settings.mime_type,
+            detail=self.image_settings.detail
+        )
+
+    def describe_captured_image(self, transcription="What's in this image?", on_token=None):
+        """
+        Waits for the snapshot, then sends it along with the transcription to the OpenAI API for a description.
+
+        Args:
+        transcription (str): The user's question, used as the prompt.
+        on_token (callable): Receives the description piece by piece as it streams in; cached
+            descriptions and error messages are passed in one piece.
+        """
+        description = self._describe_captured_image(transcription, on_token)
+        if on_token and not description.streamed:
+            on_token(description.text)
+        return description.text
+
+    def _describe_captured_image(self, transcription, on_token):
+        base64_image, frame_hash = self.get_snapshot()
+        if not base64_image:
+            return Description("Image processing failed.")
+        if frame_hash is not None:
+            text = self.scene_cache.get(frame_hash, transcription)
+            if text is not None:
+                print(f"Scene unchanged, reusing description ({self.scene_cache.stats()['hit_rate']:.0%} hit rate)")
+                return Description(text)
+        print(f"Sending image description request...")
+        description = self.request_description(transcription, base64_image, on_token=on_token)
+        if description is None:
+            return Description("Description not available or wrong response format.")
+        # A description cut off mid-stream would be repeated for the whole TTL
+        if frame_hash is not None and description.complete:
+            self.scene_cache.put(frame_hash, transcription, description.text)
+        return description
+
     def get_description_of_camera_view(self, transcription="What's in this image?"):
-        self.capture_image()
         return self.describe_captured_image(transcription=transcription)
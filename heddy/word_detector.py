@@ -1,23 +1,53 @@
+import math
 import os
-from pocketsphinx import LiveSpeech, get_model_path
+from pocketsphinx import LiveSpeech, Pocketsphinx, get_model_path
 from heddy.application_event import ApplicationEvent, ProcessingStatus
+from heddy.keyword_bus import KeywordDetection, KeywordEventBus, segment_confidence
 from heddy.resources import get_resource_dir
-from queue import Queue
 from threading import Thread
 
 
 class WordDetector:
-    def __init__(self, kws_path=None, model_path=None,) -> None:
+    def __init__(self, kws_path=None, model_path=None, audio_engine=None, bus=None) -> None:
         self.kws_path = kws_path or os.path.join(get_resource_dir(), "keywords.kws")
         self.model_path = model_path or get_model_path()
-        self.queue = Queue()
+        self.bus = bus or KeywordEventBus()
+        self.detections = self.bus.subscribe()
+        # Detections published before this bus timestamp are ignored by listen();
+        # clear() sets it to infinity until the next listen() opens a new window
+        self.since = -math.inf
         self.thread = None
-        self.suspended = False
-    
+        # With a shared AudioEngine the decoder is fed from its ring buffer
+        # instead of LiveSpeech opening the microphone itself
+        self.audio_engine = audio_engine
+
+    def detect_from_engine(self):
+        """Runs keyword spotting on frames captured by the AudioEngine, yielding the decoder per detection."""
+        decoder = Pocketsphinx(
+            verbose=False,
+            hmm=os.path.join(self.model_path, 'en-us/en-us'),
+            lm=None,
+            kws=self.kws_path
+        )
+        frames = self.audio_engine.subscribe()
+        decoder.start_utt()
+        while True:
+            data = frames.get()
+            decoder.process_raw(data, False, False)
+            if decoder.hyp():
+                # Segments are only complete once the utterance has ended
+                decoder.end_utt()
+                yield decoder
+                decoder.start_utt()
+
     def run(self,):
         print(f"Model Path: {self.model_path}")
         print(f"Keywords File Path: {self.kws_path}")
 
+        if self.audio_engine is not None:
+            self.handle_phrases(self.detect_from_engine())
+            return
+
         speech = LiveSpeech(
             verbose=False,  # Set to True for detailed logs from PocketSphinx
             sampling_rate=16000,
@@ -29,17 +59,17 @@ class WordDetector:
             kws=self.kws_path
         )
         print("PocketSphinx initialized successfully.")
+        self.handle_phrases(speech)
+
+    def handle_phrases(self, phrases):
         print("Listening for keywords...")
+        for phrase in phrases:
+            # Detailed segments are (word, log probability, start frame, end frame)
+            segments = [(seg[0].lower().strip(), seg[1]) for seg in phrase.segments(detailed=True)]
+            print(f"Detected words: {[word for word, _ in segments]}")  # Log for debugging
+            for word, log_prob in segments:
+                self.bus.publish_detection(word, segment_confidence(log_prob))
 
-        for phrase in speech:
-            detected_words = [seg[0].lower().strip() for seg in phrase.segments(detailed=True)]  # Extract words
-            print(f"Detected words: {detected_words}")  # Log for debugging
-            for word in detected_words:
-                if self.suspended:
-                    continue
-                self.queue.put(word)
-            
-        
     def run_thread(self,):
         self.thread = Thread(target=self.run)
         self.thread.start()
@@ -47,18 +77,40 @@ class WordDetector:
     def listen(self, event: ApplicationEvent):
         if self.thread is None:
             self.run_thread()
-        self.suspended = False
-        detected_words = self.queue.get()
-        event.result = detected_words
+        if self.since == math.inf:
+            self.since = self.bus.clock()
+        item = self.detections.get(since=self.since)
+        event.result = item.word if isinstance(item, KeywordDetection) else item
         event.status = ProcessingStatus.SUCCESS
         return event
-    
+
+    def wait_for(self, keyword, stop_event):
+        """
+        Blocks until keyword is detected or stop_event is set, discarding other words.
+
+        Call wake() after setting stop_event. Returns True if the keyword was detected.
+        """
+        if self.thread is None:
+            self.run_thread()
+        since = self.bus.clock()
+        while not stop_event.is_set():
+            item = self.detections.get(since=since, stop=stop_event)
+            if isinstance(item, KeywordDetection) and keyword in item.word:
+                return True
+        return False
+
+    def wake(self):
+        """Makes a pending wait_for() return right away once its stop_event is set."""
+        self.detections.wake()
+
+    def post(self, item):
+        """Delivers an item (e.g. an ApplicationEvent from another component) to the listener."""
+        self.bus.publish(item)
+
     def clear(self,):
-        # HACK: this is hacky but should work
-        self.queue = Queue()
-        self.suspended = True
-        
-        
+        """Discards everything detected so far and ignores detections until the next listen()."""
+        self.since = math.inf
+
 
 if __name__ == "__main__":
     WordDetector().run()
\ No newline at end of file
@@ -0,0 +1,98 @@
+"""
+Exercises CameraService against the file-backed fake camera.
+
+A few synthetic frames (or the images in --frames) are played back as a
+camera. Checks that the service delivers frames continuously, that the ring
+buffer stays bounded and always hands out the newest frame, that stale
+frames are not returned once the device stops, that VisionModule gets a
+snapshot from the service much faster than a per-snapshot capture would,
+and that concurrent snapshots each get their own image.
+
+Usage: python tests/cameratest.py [--frames dir_or_image] [--fps 30] [--snapshots 20]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from PIL import Image, ImageDraw
+
+from heddy.io.camera_service import CameraService, FileCameraDevice
+from heddy.vision_module import VisionModule
+
+def write_frames(directory, count=3):
+    for i in range(count):
+        image = Image.new("RGB", (1280, 720), (40 * i, 120, 200))
+        ImageDraw.Draw(image).rectangle([100 * i, 100, 100 * i + 300, 400], fill=(255, 255, 255))
+        image.save(os.path.join(directory, f"frame{i}.png"))
+    return directory
+
+def test_frames_flow(service, fps):
+    first = service.latest_frame(timeout=2.0)
+    assert first is not None, "no frame after start"
+    time.sleep(5 / fps)
+    later = service.latest_frame()
+    assert later.index > first.index, "latest frame did not advance"
+    assert len(service.buffer) <= service.buffer.frames.maxlen
+    assert later.pixels.shape == (720, 1280, 3), later.pixels.shape
+    print(f"frames flow: {service.frame_count} frames, newest #{later.index}")
+
+def test_snapshot_latency(service, snapshots):
+    vision_module = VisionModule(openai_api_key="unused", camera=service)
+    timings = []
+    for _ in range(snapshots):
+        start = time.perf_counter()
+        base64_image = vision_module.get_encoded_image()
+        timings.append(time.perf_counter() - start)
+        assert base64_image, "snapshot failed"
+    print(f"snapshot from service: median {statistics.median(timings) * 1000:.1f} ms, max {max(timings) * 1000:.1f} ms")
+
+def test_concurrent_snapshots(service):
+    # Parallel snapshot tool calls, one of them picking up the capture started at USE_SNAPSHOT
+    vision_module = VisionModule(openai_api_key="unused", camera=service)
+    vision_module.capture_image_async()
+    images = []
+    threads = [threading.Thread(target=lambda: images.append(vision_module.get_encoded_image())) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(images) == 4 and all(images), "a concurrent snapshot came back empty"
+    print("concurrent snapshots: ok")
+
+def test_stale_frames(service):
+    service.close()
+    # Older than the default max_age of latest_frame
+    time.sleep(0.6)
+    assert service.latest_frame(timeout=0.1) is None, "stale frame returned after the device stopped"
+    vision_module = VisionModule(openai_api_key="unused", camera=service)
+    assert vision_module.get_encoded_image() is None
+    print("stale frames: ok")
+
+def test_missing_frames():
+    empty = tempfile.mkdtemp()
+    try:
+        CameraService(device=empty).start()
+    except OSError:
+        print("empty fake device: ok")
+    else:
+        raise AssertionError("opening an empty fake device should fail")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser("cameratest")
+    parser.add_argument("--frames", default=None, help="Image file or directory to play back")
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--snapshots", type=int, default=20)
+    args = parser.parse_args()
+
+    frames = args.frames or write_frames(tempfile.mkdtemp())
+    service = CameraService(device=frames, fps=args.fps).start()
+    assert isinstance(service.capture, FileCameraDevice)
+    test_frames_flow(service, args.fps)
+    test_snapshot_latency(service, args.snapshots)
+    test_concurrent_snapshots(service)
+    test_stale_frames(service)
+    test_missing_frames()
+    print("all camera tests passed")
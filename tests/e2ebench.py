@@ -0,0 +1,133 @@
+"""
+Offline end-to-end benchmark of the MainController pipeline.
+
+Drives the real controller, StreamingManager, TTSManager, ElevenLabsManager,
+ZapierManager and tool executor through scripted turns against the local
+mock backends in tests/mock_backends.py, with injected latencies. Reports
+per-stage p50/p95/p99 from the tracer, the STOP_RECORDING -> LISTEN round
+trip and throughput, so regressions in the orchestration code show up
+without network or audio hardware.
+
+Usage: python tests/e2ebench.py [--turns 20] [--stream-tts] [--assistant-backend chat]
+                                [--snapshot-every 1 --snapshot-mode direct|speak]
+                                [--llm-first-token 0.6] [--tts-first-byte 0.25] ...
+"""
+import argparse
+import os
+import time
+
+from heddy.ai_backend.assistant_manager import StreamingManager, ThreadManager
+from heddy.ai_backend.chat_completions_manager import ChatCompletionsManager
+from heddy.ai_backend.zapier_manager import ZapierManager
+from heddy.application_event import ApplicationEvent, ApplicationEventType
+from heddy.http_session import http_sessions
+from heddy.main_controller import MainController
+from heddy.speech_to_text.stt_manager import STTManager
+from heddy.text_to_speech.eleven_labs import ElevenLabsManager
+from heddy.text_to_speech.streaming_pipeline import StreamingTTSPipeline
+from heddy.text_to_speech.text_to_speach_manager import TTSManager
+from heddy.tracing import tracer
+
+from mock_backends import (
+    BackendStubServer, LatencyProfile, MockAudioPlayer, MockOpenAI, MockRecorder, MockTranscriber,
+    MockVisionModule, RedirectingSession, ScriptedWordDetector)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EFFECTS = ["listening.wav", "startrecording.wav", "tricorder.wav", "respond.wav", "timerreset.wav"]
+TRANSCRIPTS = [
+    "What's the weather like today?",
+    "Send a message to Alex saying I'm running late",
+    "Tell me a short joke.",
+]
+
+def build_controller(args, latency, stub):
+    audio_player = MockAudioPlayer(playback_speed=args.playback_speed, effects=EFFECTS)
+    eleven_labs_manager = ElevenLabsManager(api_key="bench", output_format="pcm_22050")
+    eleven_labs_manager.url = f"{stub.base_url}/v1/text-to-speech/{eleven_labs_manager.voice_id}/stream"
+    tts_manager = TTSManager(eleven_labs_manager)
+    speech_pipeline = StreamingTTSPipeline(tts_manager, audio_player) if args.stream_tts else None
+    vision_module = MockVisionModule(latency)
+    thread_manager = None
+    if args.assistant_backend == "chat":
+        assistant = ChatCompletionsManager(MockOpenAI(latency), tts_pipeline=speech_pipeline, vision_module=vision_module)
+    else:
+        thread_manager = ThreadManager(MockOpenAI(latency), audio_player=audio_player)
+        assistant = StreamingManager(
+            thread_manager,
+            eleven_labs_manager,
+            assistant_id="asst_bench",
+            tts_pipeline=speech_pipeline,
+            vision_module=vision_module
+        )
+    controller = MainController(
+        assistant=assistant,
+        transcriber=STTManager(transcriber=MockTranscriber(TRANSCRIPTS, latency)),
+        synthesizer=tts_manager,
+        audio_player=audio_player,
+        vision_module=vision_module,
+        word_detector=ScriptedWordDetector(args.turns, speech_seconds=args.speech_seconds, snapshot_every=args.snapshot_every),
+        speech_pipeline=speech_pipeline,
+        zapier=ZapierManager(session=RedirectingSession(http_sessions.session, stub.base_url)),
+        recorder=MockRecorder(os.path.join(ROOT, "listening.wav")),
+        speculate=not args.no_speculate,
+        snapshot_mode=args.snapshot_mode,
+    )
+    return controller, thread_manager
+
+def report(elapsed, turns, stub):
+    summary = tracer.summary()
+    print(f"\n{'stage':>20} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, stats in sorted(summary.items(), key=lambda item: -item[1]["sum"]):
+        print(f"{name:>20} {stats['count']:>6} {stats['p50'] * 1000:9.1f} {stats['p95'] * 1000:9.1f} {stats['p99'] * 1000:9.1f}")
+    print(f"\n{turns} turns in {elapsed:.2f}s: {turns / elapsed:.2f} turns/s, {len(stub.webhook_calls)} webhook calls")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser("e2ebench")
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--stream-tts", action="store_true")
+    parser.add_argument("--assistant-backend", default="assistants", choices=["assistants", "chat"])
+    parser.add_argument("--no-speculate", action="store_true", help="Don't prepare the assistant during recording")
+    parser.add_argument("--snapshot-every", type=int, default=0, help="Say 'snapshot' in every n-th turn (0 never)")
+    parser.add_argument("--snapshot-mode", default="describe", choices=["describe", "direct", "speak"])
+    parser.add_argument("--speech-seconds", type=float, default=0.0, help="Simulated user speech per turn")
+    parser.add_argument("--playback-speed", type=float, default=0.0, help="1.0 plays audio in real time, 0 skips playback time")
+    parser.add_argument("--api-request", type=float, default=LatencyProfile.api_request, help="Round trip of each OpenAI request")
+    parser.add_argument("--stt", type=float, default=LatencyProfile.stt)
+    parser.add_argument("--llm-first-token", type=float, default=LatencyProfile.assistant_first_token)
+    parser.add_argument("--llm-token-interval", type=float, default=LatencyProfile.assistant_token_interval)
+    parser.add_argument("--tts-first-byte", type=float, default=LatencyProfile.tts_first_byte)
+    parser.add_argument("--tts-chunk-interval", type=float, default=LatencyProfile.tts_chunk_interval)
+    parser.add_argument("--zapier", type=float, default=LatencyProfile.zapier)
+    parser.add_argument("--camera-capture", type=float, default=LatencyProfile.camera_capture)
+    parser.add_argument("--vision-description", type=float, default=LatencyProfile.vision_description)
+    parser.add_argument("--vision-first-token", type=float, default=LatencyProfile.vision_first_token)
+    parser.add_argument("--trace-file", type=str, default=None)
+    args = parser.parse_args()
+
+    latency = LatencyProfile(
+        api_request=args.api_request,
+        stt=args.stt,
+        assistant_first_token=args.llm_first_token,
+        assistant_token_interval=args.llm_token_interval,
+        tts_first_byte=args.tts_first_byte,
+        tts_chunk_interval=args.tts_chunk_interval,
+        zapier=args.zapier,
+        camera_capture=args.camera_capture,
+        vision_description=args.vision_description,
+        vision_first_token=args.vision_first_token
+    )
+    tracer.configure(jsonl_path=args.trace_file)
+    # Sound effects are looked up relative to the working directory
+    os.chdir(ROOT)
+    stub = BackendStubServer(latency).start()
+    controller, thread_manager = build_controller(args, latency, stub)
+
+    start = time.perf_counter()
+    controller.run(ApplicationEvent(ApplicationEventType.START))
+    elapsed = time.perf_counter() - start
+
+    # The 90 second thread reset timer would otherwise keep the process alive
+    if thread_manager is not None and thread_manager.reset_timer is not None:
+        thread_manager.reset_timer.cancel()
+    stub.shutdown()
+    report(elapsed, args.turns, stub)
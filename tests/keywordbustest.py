@@ -0,0 +1,128 @@
+"""
+Replays recorded keyword sequences through WordDetector at high rate.
+
+The detector runs on a replay clock instead of the microphone, so the
+results are deterministic: every detection published inside a listen
+window must be delivered exactly once and in order, and nothing detected
+before clear() may leak into the next window, no matter how fast the
+phrases arrive or how clear() interleaves with publishing.
+
+Usage: python tests/keywordbustest.py [--phrases 20000]
+"""
+import argparse
+import random
+import threading
+
+from heddy.application_event import ApplicationEvent, ApplicationEventType
+from heddy.keyword_bus import KeywordEventBus
+from heddy.word_detector import WordDetector
+
+# (seconds since start, words) as logged by handle_phrases during a session
+RECORDED_SESSION = [
+    (0.0, ["computer"]),
+    (4.1, ["stop"]),
+    (9.8, ["computer"]),
+    (10.2, ["snapshot"]),
+    (14.6, ["stop"]),
+    (20.3, ["computer", "stop"]),
+]
+
+
+class ReplayClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class ReplayedPhrase:
+    def __init__(self, words):
+        self.words = words
+
+    def segments(self, detailed=False):
+        return [(word, 0, 0, 0) for word in self.words]
+
+
+def replay(clock, session, repeats):
+    """Yields the recorded phrases `repeats` times, advancing the clock to each phrase's offset."""
+    duration = session[-1][0] + 1.0
+    for i in range(repeats):
+        for offset, words in session:
+            clock.now = i * duration + offset
+            yield ReplayedPhrase(words)
+
+
+def make_detector(clock, max_items):
+    bus = KeywordEventBus(clock=clock)
+    detector = WordDetector(kws_path="unused", model_path="unused", bus=bus)
+    bus.unsubscribe(detector.detections)
+    detector.detections = bus.subscribe(max_items)
+    # Mark the detector as running so listen() doesn't open the microphone
+    detector.thread = threading.current_thread()
+    return detector
+
+
+def listen(detector):
+    return detector.listen(ApplicationEvent(ApplicationEventType.LISTEN)).result
+
+
+def test_lossless_in_order(repeats):
+    clock = ReplayClock()
+    expected = [word for _, words in RECORDED_SESSION for word in words] * repeats
+    detector = make_detector(clock, max_items=len(expected))
+    detector.handle_phrases(replay(clock, RECORDED_SESSION, repeats))
+    received = [listen(detector) for _ in expected]
+    assert received == expected, "detections were lost or reordered"
+    assert detector.detections.dropped == 0 and detector.detections.stale == 0
+
+
+def test_concurrent_consumer(repeats):
+    clock = ReplayClock()
+    expected = [word for _, words in RECORDED_SESSION for word in words] * repeats
+    detector = make_detector(clock, max_items=len(expected))
+    publisher = threading.Thread(target=detector.handle_phrases, args=(replay(clock, RECORDED_SESSION, repeats),))
+    publisher.start()
+    received = [listen(detector) for _ in expected]
+    publisher.join()
+    assert received == expected, "detections were lost or reordered under concurrency"
+
+
+def test_clear_discards_stale():
+    clock = ReplayClock()
+    detector = make_detector(clock, max_items=64)
+    detector.handle_phrases(replay(clock, RECORDED_SESSION, 1))
+    # Transition: everything above happened before the new state
+    detector.clear()
+    clock.now += 1.0
+    detector.post("marker")
+    assert listen(detector) == "marker"
+    assert detector.detections.stale == sum(len(words) for _, words in RECORDED_SESSION)
+
+
+def test_clear_between_phrases(repeats, seed=1234):
+    """Clears at random points of the replay; each new window must start with the first item after it."""
+    rng = random.Random(seed)
+    clock = ReplayClock()
+    detector = make_detector(clock, max_items=1024)
+    for phrase in replay(clock, RECORDED_SESSION, repeats):
+        detector.handle_phrases([phrase])
+        if rng.random() < 0.05:
+            detector.clear()
+            clock.now += 0.001
+            detector.post("marker")
+            assert listen(detector) == "marker"
+            assert detector.since == clock.now
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser("keywordbustest")
+    parser.add_argument("--phrases", type=int, default=20000)
+    args = parser.parse_args()
+    repeats = max(1, args.phrases // len(RECORDED_SESSION))
+
+    test_lossless_in_order(repeats)
+    test_concurrent_consumer(repeats)
+    test_clear_discards_stale()
+    test_clear_between_phrases(repeats)
+    print(f"OK: replayed {repeats * len(RECORDED_SESSION)} phrases")
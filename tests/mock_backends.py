@@ -0,0 +1,577 @@
+"""
+Local stand-ins for everything MainController talks to, for offline benchmarks.
+
+- MockOpenAI mimics the parts of the Assistants streaming API used by
+  StreamingManager (yielding real openai stream event types) and the
+  streaming chat completions API used by ChatCompletionsManager.
+- BackendStubServer is a local HTTP server that answers like the
+  ElevenLabs /stream endpoint and a Zapier webhook, so the real
+  ElevenLabsManager and ZapierManager code paths (HTTP session, PCM
+  streaming) are exercised.
+- MockTranscriber, MockRecorder, MockAudioPlayer, MockVisionModule and
+  ScriptedWordDetector replace the microphone, speakers, STT, camera and
+  keyword spotting.
+
+Every backend sleeps for the latencies in a LatencyProfile, so slow
+networks or models can be simulated deterministically.
+"""
+import json
+import threading
+import time
+import uuid
+import wave
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import urlsplit
+
+from openai.types.beta.assistant_stream_event import (
+    ThreadRunCreated, ThreadMessageDelta, ThreadRunRequiresAction, ThreadRunCompleted, ThreadRunCancelled)
+
+from heddy.application_event import ApplicationEvent, ApplicationEventType, ProcessingStatus
+from heddy.io.recorded_audio import RecordedAudio
+from heddy.speech_to_text.stt_manager import STTResult, STTStatus
+from heddy.text_to_speech.text_to_speach_manager import PCMAudio, discard_audio
+from heddy.vision_module import ImagePrompt
+
+
+@dataclass
+class LatencyProfile:
+    """Injected latencies in seconds."""
+    # Round trip of every OpenAI API request, before any streamed output
+    api_request: float = 0.15
+    stt: float = 0.3
+    assistant_first_token: float = 0.6
+    assistant_token_interval: float = 0.02
+    tts_first_byte: float = 0.25
+    tts_chunk_interval: float = 0.01
+    zapier: float = 0.4
+    camera_capture: float = 0.8
+    # A full, non-streamed vision completion describing the snapshot
+    vision_description: float = 1.5
+    # The same completion streamed
+    vision_first_token: float = 0.7
+    vision_token_interval: float = 0.03
+
+
+# Streamed assistant answers are split into tokens of roughly this many characters
+TOKEN_CHARS = 4
+VISION_DESCRIPTION = "A desk with a laptop, a coffee mug and a notebook."
+
+
+def message_text(content):
+    """Text of a message whose content may be a list of multimodal parts."""
+    if isinstance(content, list):
+        return " ".join(part["text"] for part in content if part.get("type") == "text")
+    return content
+
+
+def construct(event_type, **fields):
+    """Builds an openai stream event without validation, so plain namespaces can stand in for nested models."""
+    return event_type.construct(**fields)
+
+
+class MockStream:
+    """Context manager that yields a scripted list of (delay, event) pairs like an AssistantStreamManager."""
+
+    def __init__(self, runs, thread_id, run_id, events):
+        self.runs = runs
+        self.thread_id = thread_id
+        self.run_id = run_id
+        self.events = events
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def __iter__(self):
+        run = SimpleNamespace(id=self.run_id, thread_id=self.thread_id)
+        yield construct(ThreadRunCreated, event="thread.run.created", data=run)
+        for delay, event in self.events:
+            time.sleep(delay)
+            if self.run_id in self.runs.cancelled:
+                yield construct(ThreadRunCancelled, event="thread.run.cancelled", data=run)
+                return
+            yield event
+
+
+class MockRuns:
+    def __init__(self, assistant):
+        self.assistant = assistant
+        self.cancelled = set()
+        self.pending_replies = {}
+
+    def _reply_events(self, thread_id, run_id, text):
+        latency = self.assistant.latency
+        tokens = [text[i:i + TOKEN_CHARS] for i in range(0, len(text), TOKEN_CHARS)]
+        events = []
+        for i, token in enumerate(tokens):
+            delta = SimpleNamespace(content=[SimpleNamespace(text=SimpleNamespace(value=token))])
+            delay = latency.assistant_first_token if i == 0 else latency.assistant_token_interval
+            events.append((delay, construct(ThreadMessageDelta, event="thread.message.delta", data=SimpleNamespace(delta=delta))))
+        run = SimpleNamespace(id=run_id, thread_id=thread_id)
+        events.append((0.0, construct(ThreadRunCompleted, event="thread.run.completed", data=run)))
+        return MockStream(self, thread_id, run_id, events)
+
+    def create_and_stream(self, thread_id, assistant_id):
+        time.sleep(self.assistant.latency.api_request)
+        run_id = f"run_{uuid.uuid4().hex[:12]}"
+        message = self.assistant.last_message.get(thread_id, "")
+        tool_message, reply = self.assistant.script(message)
+        if tool_message is None:
+            return self._reply_events(thread_id, run_id, reply)
+        self.pending_replies[run_id] = reply
+        call = SimpleNamespace(
+            id=f"call_{uuid.uuid4().hex[:12]}",
+            function=SimpleNamespace(name="send_text_message", arguments=json.dumps({"message": tool_message}))
+        )
+        data = SimpleNamespace(
+            id=run_id,
+            thread_id=thread_id,
+            required_action=SimpleNamespace(
+                type="submit_tool_outputs",
+                submit_tool_outputs=SimpleNamespace(tool_calls=[call])
+            )
+        )
+        event = construct(ThreadRunRequiresAction, event="thread.run.requires_action", data=data)
+        return MockStream(self, thread_id, run_id, [(self.assistant.latency.assistant_first_token, event)])
+
+    def submit_tool_outputs_stream(self, tool_outputs, run_id, thread_id):
+        time.sleep(self.assistant.latency.api_request)
+        return self._reply_events(thread_id, run_id, self.pending_replies.pop(run_id, "Done."))
+
+    def cancel(self, run_id, thread_id):
+        self.cancelled.add(run_id)
+
+
+class MockMessages:
+    def __init__(self, assistant):
+        self.assistant = assistant
+
+    def create(self, thread_id, role, content):
+        time.sleep(self.assistant.latency.api_request)
+        self.assistant.last_message[thread_id] = message_text(content)
+        return SimpleNamespace(id=f"msg_{uuid.uuid4().hex[:12]}")
+
+
+class MockThreads:
+    def __init__(self, assistant):
+        self.assistant = assistant
+        self.messages = MockMessages(assistant)
+        self.runs = MockRuns(assistant)
+
+    def create(self):
+        time.sleep(self.assistant.latency.api_request)
+        return SimpleNamespace(id=f"thread_{uuid.uuid4().hex[:12]}")
+
+    def retrieve(self, thread_id):
+        time.sleep(self.assistant.latency.api_request)
+        return SimpleNamespace(id=thread_id)
+
+
+class MockModels:
+    def __init__(self, assistant):
+        self.assistant = assistant
+
+    def list(self):
+        time.sleep(self.assistant.latency.api_request)
+        return []
+
+
+def default_script(message):
+    """Messages asking to send something trigger a send_text_message tool call before the answer."""
+    if message.lower().startswith("send"):
+        return message, "I sent your message. Is there anything else I can do for you?"
+    return None, f"You said: {message}. Here is a reasonably long answer, so it is split into several sentences. That should be enough."
+
+
+class MockChatStream:
+    """Iterable of chat completion chunks with injected delays; close() ends it early."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.closed = False
+
+    def __iter__(self):
+        for delay, delta in self.chunks:
+            time.sleep(delay)
+            if self.closed:
+                return
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+    def close(self):
+        self.closed = True
+
+
+class MockCompletions:
+    def __init__(self, assistant):
+        self.assistant = assistant
+
+    def create(self, model, messages, tools=None, stream=False, max_tokens=None):
+        latency = self.assistant.latency
+        time.sleep(latency.api_request)
+        if not stream:
+            # Summaries of old turns
+            message = SimpleNamespace(content="The user and the assistant talked about several things.")
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+        last = messages[-1]
+        if last["role"] == "tool":
+            reply = self.assistant.script(message_text(messages[-3]["content"]))[1]
+            tool_message = None
+        else:
+            tool_message, reply = self.assistant.script(message_text(last["content"]))
+        if tool_message is not None:
+            function = SimpleNamespace(name="send_text_message", arguments=json.dumps({"message": tool_message}))
+            fragment = SimpleNamespace(index=0, id=f"call_{uuid.uuid4().hex[:12]}", function=function)
+            return MockChatStream([(latency.assistant_first_token, SimpleNamespace(content=None, tool_calls=[fragment]))])
+        tokens = [reply[i:i + TOKEN_CHARS] for i in range(0, len(reply), TOKEN_CHARS)]
+        return MockChatStream([
+            (latency.assistant_first_token if i == 0 else latency.assistant_token_interval,
+             SimpleNamespace(content=token, tool_calls=None))
+            for i, token in enumerate(tokens)
+        ])
+
+
+class MockFiles:
+    def __init__(self, assistant):
+        self.assistant = assistant
+        self.uploaded = 0
+
+    def create(self, file, purpose):
+        time.sleep(self.assistant.latency.api_request)
+        self.uploaded += 1
+        return SimpleNamespace(id=f"file_{uuid.uuid4().hex[:12]}")
+
+    def delete(self, file_id):
+        time.sleep(self.assistant.latency.api_request)
+
+
+class MockOpenAI:
+    """Drop-in for openai.OpenAI covering client.beta.threads, client.chat.completions, client.models and client.files."""
+
+    def __init__(self, latency: LatencyProfile, script=default_script):
+        self.latency = latency
+        self.script = script
+        self.last_message = {}
+        self.beta = SimpleNamespace(threads=MockThreads(self))
+        self.chat = SimpleNamespace(completions=MockCompletions(self))
+        self.models = MockModels(self)
+        self.files = MockFiles(self)
+
+
+class BackendStubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        latency = self.server.latency
+        # One entry per request; requests on a kept-alive connection share the port
+        self.server.client_ports.append(self.client_address[1])
+        if "/text-to-speech/" in self.path:
+            self.stream_speech(body.get("text", ""), latency)
+        elif self.path == "/v1/chat/completions" and body.get("stream"):
+            self.stream_completion(VISION_DESCRIPTION, latency)
+        elif self.path.startswith("/hooks/"):
+            time.sleep(latency.zapier)
+            self.server.webhook_calls.append(body)
+            self.send_body(b"ok")
+        else:
+            self.send_error(404)
+
+    def stream_speech(self, text, latency):
+        # Roughly 60 ms of 22.05 kHz 16-bit silence per character
+        audio = bytes(int(len(text) * 0.06 * 22050) * 2)
+        chunk_size = 4096
+        time.sleep(latency.tts_first_byte)
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/pcm")
+        self.send_header("Content-Length", str(len(audio)))
+        self.end_headers()
+        for i in range(0, len(audio), chunk_size):
+            if i:
+                time.sleep(latency.tts_chunk_interval)
+            self.wfile.write(audio[i:i + chunk_size])
+            self.wfile.flush()
+
+    def stream_completion(self, text, latency):
+        """Answers like the chat completions API with stream=True: chunked server-sent events."""
+        time.sleep(latency.vision_first_token)
+        if self.server.completion_status != 200:
+            self.send_response(self.server.completion_status)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"{}")
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        tokens = [text[i:i + TOKEN_CHARS] for i in range(0, len(text), TOKEN_CHARS)]
+        if self.server.completion_truncated:
+            tokens = tokens[:len(tokens) // 2]
+        for i, token in enumerate(tokens):
+            if i:
+                time.sleep(latency.vision_token_interval)
+            self.write_chunk(f"data: {json.dumps({'choices': [{'index': 0, 'delta': {'content': token}}]})}\n\n")
+        if not self.server.completion_truncated:
+            self.write_chunk("data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def write_chunk(self, data):
+        data = data.encode("utf-8")
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def send_body(self, body):
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class BackendStubServer:
+    """Serves fake ElevenLabs, Zapier and streamed chat completion (vision) endpoints on localhost."""
+
+    def __init__(self, latency: LatencyProfile):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), BackendStubHandler)
+        self.server.daemon_threads = True
+        self.server.latency = latency
+        self.server.webhook_calls = []
+        self.server.client_ports = []
+        # Set to an error code to make streamed completions fail
+        self.server.completion_status = 200
+        # Set to end streamed completions halfway, without [DONE]
+        self.server.completion_truncated = False
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    @property
+    def webhook_calls(self):
+        return self.server.webhook_calls
+
+    @property
+    def client_ports(self):
+        return self.server.client_ports
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def shutdown(self):
+        self.server.shutdown()
+
+
+class RedirectingSession:
+    """Wraps a requests session and sends every request to base_url instead of the original host."""
+
+    def __init__(self, session, base_url):
+        self.session = session
+        self.base_url = base_url
+
+    def post(self, url, **kwargs):
+        parts = urlsplit(url)
+        return self.session.post(self.base_url + parts.path, **kwargs)
+
+
+class MockTranscriber:
+    """Returns scripted transcripts after the injected STT latency."""
+
+    def __init__(self, transcripts, latency: LatencyProfile):
+        self.transcripts = list(transcripts)
+        self.latency = latency
+        self.turn = 0
+
+    def transcribe_audio_file(self, audio):
+        time.sleep(self.latency.stt)
+        text = self.transcripts[self.turn % len(self.transcripts)]
+        self.turn += 1
+        return STTResult(text, None, STTStatus.SUCCESS)
+
+
+def read_wav(file_path):
+    with wave.open(file_path, 'rb') as wf:
+        return RecordedAudio(
+            pcm=memoryview(wf.readframes(wf.getnframes())),
+            sample_rate=wf.getframerate(),
+            channels=wf.getnchannels(),
+            sample_width=wf.getsampwidth()
+        )
+
+
+class MockRecorder:
+    """Hands out a prerecorded WAV as the user's utterance."""
+
+    def __init__(self, wav_path):
+        self.audio = read_wav(wav_path)
+        self.listeners = []
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def start_recording(self):
+        pass
+
+    def stop_recording(self):
+        for listener in self.listeners:
+            listener(bytes(self.audio.pcm))
+
+    def get_audio(self):
+        return self.audio
+
+
+class MockAudioPlayer:
+    """
+    Consumes audio instead of playing it.
+
+    With playback_speed > 0 it sleeps for the audio's duration divided by
+    that factor (1.0 is real time), otherwise playback is instantaneous
+    and only download/synthesis time is measured.
+    """
+
+    def __init__(self, playback_speed=0.0, effects=()):
+        self.playback_speed = playback_speed
+        self.interrupted = threading.Event()
+        self.effects = {file_path: read_wav(file_path) for file_path in effects}
+        self.played_bytes = 0
+
+    def stop(self):
+        self.interrupted.set()
+
+    def resume(self):
+        self.interrupted.clear()
+
+    def _sleep_for(self, audio: RecordedAudio):
+        if self.playback_speed > 0:
+            time.sleep(audio.duration / self.playback_speed)
+
+    def play_sound(self, file_path, block=False):
+        done = threading.Event()
+        audio = self.effects.get(file_path) or read_wav(file_path)
+        if block:
+            self._sleep_for(audio)
+            done.set()
+        else:
+            threading.Thread(target=lambda: (self._sleep_for(audio), done.set()), daemon=True).start()
+        return done
+
+    def play(self, event: ApplicationEvent):
+        audio = event.request
+        if isinstance(audio, PCMAudio):
+            for chunk in audio.chunks:
+                if self.interrupted.is_set():
+                    discard_audio(audio)
+                    break
+                self.played_bytes += len(chunk)
+                self._sleep_for(RecordedAudio(memoryview(chunk), audio.sample_rate, audio.channels, audio.sample_width))
+        else:
+            self.played_bytes += len(audio)
+        return ApplicationEvent(
+            type=ApplicationEventType.PLAY,
+            status=ProcessingStatus.SUCCESS
+        )
+
+
+class MockVisionModule:
+    """Stands in for VisionModule: a camera that takes camera_capture seconds and a slow description request."""
+
+    def __init__(self, latency: LatencyProfile):
+        self.latency = latency
+        self.capture_complete = threading.Event()
+        self.capture_pending = False
+        self.descriptions = 0
+
+    def capture_image_async(self):
+        self.capture_complete.clear()
+        self.capture_pending = True
+        threading.Thread(target=self.capture, daemon=True).start()
+
+    def capture(self):
+        time.sleep(self.latency.camera_capture)
+        self.capture_complete.set()
+
+    def get_encoded_image(self):
+        if not self.capture_pending:
+            self.capture_complete.clear()
+            self.capture()
+        self.capture_complete.wait()
+        self.capture_pending = False
+        return "iVBORw0KGgo="
+
+    def get_image_prompt(self, transcription):
+        return ImagePrompt(text=transcription, base64_image=self.get_encoded_image())
+
+    def get_image_description(self, transcription, base64_image):
+        time.sleep(self.latency.vision_description)
+        self.descriptions += 1
+        return VISION_DESCRIPTION
+
+    def describe_captured_image(self, transcription="What's in this image?", on_token=None):
+        base64_image = self.get_encoded_image()
+        if on_token is None:
+            return self.get_image_description(transcription, base64_image)
+        time.sleep(self.latency.vision_first_token)
+        self.descriptions += 1
+        tokens = [VISION_DESCRIPTION[i:i + TOKEN_CHARS] for i in range(0, len(VISION_DESCRIPTION), TOKEN_CHARS)]
+        for i, token in enumerate(tokens):
+            if i:
+                time.sleep(self.latency.vision_token_interval)
+            on_token(token)
+        return VISION_DESCRIPTION
+
+    def get_description_of_camera_view(self, transcription="What's in this image?"):
+        return self.get_image_description(transcription, self.get_encoded_image())
+
+
+class ScriptedWordDetector:
+    """
+    Replaces the keyword spotter with a script of turns.
+
+    Each turn says "computer", speaks for speech_seconds and says "reply";
+    every snapshot_every-th turn also says "snapshot" halfway through. Once
+    all turns are done listen() returns an EXIT event.
+    """
+
+    def __init__(self, turns, speech_seconds=0.0, snapshot_every=0):
+        self.words = []
+        for turn in range(1, turns + 1):
+            if snapshot_every and turn % snapshot_every == 0:
+                self.words += ["computer", "snapshot", "reply"]
+            else:
+                self.words += ["computer", "reply"]
+        self.speech_seconds = speech_seconds
+
+    def listen(self, event: ApplicationEvent):
+        if not self.words:
+            event.result = ApplicationEvent(ApplicationEventType.EXIT)
+        else:
+            word = self.words.pop(0)
+            if word in ("snapshot", "reply"):
+                time.sleep(self.speech_seconds / 2)
+            event.result = word
+        event.status = ProcessingStatus.SUCCESS
+        return event
+
+    def wait_for(self, keyword, stop_event):
+        stop_event.wait()
+        return False
+
+    def wake(self):
+        pass
+
+    def post(self, item):
+        pass
+
+    def clear(self):
+        pass
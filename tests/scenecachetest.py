@@ -0,0 +1,104 @@
+"""
+Checks that VisionModule reuses descriptions while the scene is unchanged.
+
+Frames are played back through the fake camera: the same scene with
+sensor noise must hit the cache, a changed scene, another question or an
+expired entry must miss it, and a description cut off mid-stream must
+not be cached. The vision request is replaced by a counter, so no API
+key is needed. Prints the hash distances of noisy and changed frames to
+help pick --scene-change-threshold.
+
+Usage: python tests/scenecachetest.py [--noise 12] [--threshold 10]
+"""
+import argparse
+import os
+import random
+import tempfile
+
+from PIL import Image, ImageDraw
+
+from heddy.image_preprocessing import difference_hash, hash_distance
+from heddy.io.camera_service import CameraService
+from heddy.scene_cache import SceneCache
+from heddy.vision_module import Description, VisionModule
+
+
+class ManualClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingVisionModule(VisionModule):
+    def __init__(self, **kwargs):
+        super().__init__(openai_api_key="unused", **kwargs)
+        self.requests = 0
+
+    def request_description(self, transcription, base64_image, on_token=None):
+        self.requests += 1
+        # The fifth request breaks off mid-stream
+        return Description(f"description {self.requests}", streamed=True, complete=self.requests != 5)
+
+
+def desk(noise, moved=False, seed=0):
+    rng = random.Random(seed)
+    image = Image.new("RGB", (1280, 720), (150, 120, 90))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle([300, 200, 700, 450], fill=(30, 30, 30))  # laptop
+    mug = (1000, 300) if moved else (800, 350)
+    draw.ellipse([mug[0], mug[1], mug[0] + 120, mug[1] + 120], fill=(230, 230, 230))
+    # Sensor noise on a sparse grid of pixels
+    pixels = image.load()
+    for _ in range(20000):
+        x, y = rng.randrange(1280), rng.randrange(720)
+        r, g, b = pixels[x, y]
+        delta = rng.randint(-noise, noise)
+        pixels[x, y] = (max(0, min(255, r + delta)), max(0, min(255, g + delta)), max(0, min(255, b + delta)))
+    return image
+
+def snapshot(vision_module, image, prompt="What's on my desk?"):
+    path = os.path.join(tempfile.mkdtemp(), "frame.png")
+    image.save(path)
+    camera = CameraService(device=path, fps=30).start()
+    vision_module.camera = camera
+    try:
+        return vision_module.describe_captured_image(prompt)
+    finally:
+        camera.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser("scenecachetest")
+    parser.add_argument("--noise", type=int, default=12)
+    parser.add_argument("--threshold", type=int, default=10)
+    args = parser.parse_args()
+
+    base = difference_hash(desk(args.noise, seed=0))
+    noisy = [hash_distance(base, difference_hash(desk(args.noise, seed=seed))) for seed in range(1, 6)]
+    changed = hash_distance(base, difference_hash(desk(args.noise, moved=True, seed=7)))
+    print(f"hash distance: noisy frames {noisy}, moved mug {changed}, threshold {args.threshold}")
+
+    clock = ManualClock()
+    cache = SceneCache(ttl=60.0, threshold=args.threshold, clock=clock)
+    vision_module = CountingVisionModule(scene_cache=cache)
+
+    first = snapshot(vision_module, desk(args.noise, seed=0))
+    assert snapshot(vision_module, desk(args.noise, seed=1)) == first, "unchanged scene missed the cache"
+    assert snapshot(vision_module, desk(args.noise, seed=2), prompt="what's on my desk") == first, "rephrased prompt missed"
+    assert vision_module.requests == 1
+    assert snapshot(vision_module, desk(args.noise, seed=3), prompt="Is the laptop open?") != first, "other prompt hit"
+    assert snapshot(vision_module, desk(args.noise, moved=True, seed=4)) != first, "changed scene hit the cache"
+    assert vision_module.requests == 3
+    clock.now = 61.0
+    snapshot(vision_module, desk(args.noise, seed=5))
+    assert vision_module.requests == 4, "expired entry was reused"
+    clock.now = 200.0
+    truncated = snapshot(vision_module, desk(args.noise, seed=6))
+    assert snapshot(vision_module, desk(args.noise, seed=7)) != truncated, "truncated description was cached"
+    assert vision_module.requests == 6
+
+    stats = cache.stats()
+    print(f"hits {stats['hits']}, misses {stats['misses']}, hit rate {stats['hit_rate']:.0%}")
+    assert stats["hits"] == 2 and stats["misses"] == 6, stats
+    print("all scene cache tests passed")
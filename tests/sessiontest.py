@@ -0,0 +1,48 @@
+"""
+Checks that the API clients reuse one keep-alive connection across turns.
+
+ElevenLabsManager and ZapierManager send their requests through the shared
+http_sessions session to the local stub in tests/mock_backends.py, which
+records the client port of every request. Each turn synthesizes a reply
+and calls the webhook; all requests should arrive on the same connection.
+
+Usage: python tests/sessiontest.py [--turns 5]
+"""
+import argparse
+
+from heddy.ai_backend.zapier_manager import ZapierManager
+from heddy.application_event import ApplicationEvent, ApplicationEventType, ProcessingStatus
+from heddy.http_session import http_sessions
+from heddy.text_to_speech.eleven_labs import ElevenLabsManager
+from heddy.text_to_speech.text_to_speach_manager import TTSStatus
+
+from mock_backends import BackendStubServer, LatencyProfile, RedirectingSession
+
+
+def run_turns(stub, turns):
+    eleven_labs_manager = ElevenLabsManager(api_key="unused", output_format="pcm_22050")
+    eleven_labs_manager.url = f"{stub.base_url}/v1/text-to-speech/{eleven_labs_manager.voice_id}/stream"
+    zapier = ZapierManager(session=RedirectingSession(http_sessions.session, stub.base_url))
+    for turn in range(turns):
+        result = eleven_labs_manager(f"Reply number {turn}.")
+        assert result.status == TTSStatus.SUCCESS, result.error
+        # Draining the stream hands the connection back to the pool
+        assert sum(len(chunk) for chunk in result.audio.chunks) > 0
+        event = zapier.handle_message(ApplicationEvent(ApplicationEventType.ZAPIER, request={"message": f"turn {turn}"}))
+        assert event.status == ProcessingStatus.SUCCESS, event.error
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser("sessiontest")
+    parser.add_argument("--turns", type=int, default=5)
+    args = parser.parse_args()
+
+    stub = BackendStubServer(LatencyProfile(tts_first_byte=0.0, tts_chunk_interval=0.0, zapier=0.0)).start()
+    try:
+        run_turns(stub, args.turns)
+    finally:
+        stub.shutdown()
+    ports = stub.client_ports
+    print(f"Requests: {len(ports)}, connections: {len(set(ports))}")
+    assert len(ports) == 2 * args.turns, ports
+    assert len(set(ports)) == 1, "Expected every turn to reuse the same connection"
+    print("Connection reused across turns.")
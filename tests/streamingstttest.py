@@ -0,0 +1,63 @@
+"""
+Compares chunked streaming transcription against the batch path on a WAV file.
+
+The file is fed through WhisperStreamingSession in recorder-sized chunks,
+paced in real time, the way AudioRecorder delivers them. The latency that
+matters is the time from the last chunk (the moment "reply" would be
+detected) to the final text, compared with a batch transcribe_audio_file
+call on the whole recording.
+
+Usage: python tests/streamingstttest.py path/to/speech.wav [--no-realtime]
+"""
+import sys
+import time
+import wave
+
+import numpy as np
+
+from heddy.io.recorded_audio import RecordedAudio
+from heddy.speech_to_text.faster_whisper_transcriber import WhisperTranscriber
+
+CHUNK_FRAMES = 1024
+SAMPLE_RATE = 16000
+
+def load_pcm16k(path):
+    """Reads a WAV file and converts it to 16 kHz mono int16 PCM."""
+    with wave.open(path, 'rb') as wf:
+        channels = wf.getnchannels()
+        rate = wf.getframerate()
+        samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    if rate != SAMPLE_RATE:
+        positions = np.arange(0, len(samples), rate / SAMPLE_RATE)
+        samples = np.interp(positions, np.arange(len(samples)), samples)
+    return samples.astype(np.int16).tobytes()
+
+def run(path, realtime=True):
+    transcriber = WhisperTranscriber()
+    pcm = load_pcm16k(path)
+
+    start = time.perf_counter()
+    batch = transcriber.transcribe_audio_file(RecordedAudio(memoryview(pcm)))
+    batch_latency = time.perf_counter() - start
+
+    session = transcriber.start_stream()
+    chunk_bytes = CHUNK_FRAMES * 2
+    for offset in range(0, len(pcm), chunk_bytes):
+        session.feed(pcm[offset:offset + chunk_bytes])
+        if realtime:
+            time.sleep(CHUNK_FRAMES / SAMPLE_RATE)
+    start = time.perf_counter()
+    streamed = session.finish()
+    streamed_latency = time.perf_counter() - start
+
+    print(f"Audio duration:   {len(pcm) / (SAMPLE_RATE * 2):.2f}s")
+    print(f"Batch:     {batch_latency:.3f}s after stop -> '{batch.text}'")
+    print(f"Streaming: {streamed_latency:.3f}s after stop -> '{streamed.text}'")
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    run(sys.argv[1], realtime="--no-realtime" not in sys.argv)
@@ -0,0 +1,72 @@
+"""
+Compares time-to-first-audio and total synthesis time between TTS backends.
+
+Each phrase is synthesized `--repeats` times per backend. Time to first
+audio is measured until the first PCM chunk (or the full body, for
+encoded formats) is available. ElevenLabs needs ELEVENLABS_API_KEY in the
+environment or .env; it is skipped otherwise.
+
+Usage: python tests/ttsbench.py [--backends elevenlabs,espeak] [--repeats 3]
+"""
+import argparse
+import os
+import statistics
+import time
+
+from dotenv import load_dotenv
+
+from heddy.text_to_speech.eleven_labs import ElevenLabsManager
+from heddy.text_to_speech.espeak import EspeakTTS
+from heddy.text_to_speech.text_to_speach_manager import PCMAudio, TTSStatus
+
+PHRASES = [
+    "Hello! How can I assist you today?",
+    "Sure.",
+    "The weather today is sunny with a high of twenty five degrees and a light breeze from the west.",
+]
+
+def measure(synthesizer, text):
+    start = time.perf_counter()
+    result = synthesizer(text)
+    if result.status != TTSStatus.SUCCESS:
+        raise RuntimeError(result.error)
+    first_audio = None
+    if isinstance(result.audio, PCMAudio):
+        for _ in result.audio.chunks:
+            if first_audio is None:
+                first_audio = time.perf_counter() - start
+    else:
+        first_audio = time.perf_counter() - start
+    return first_audio, time.perf_counter() - start
+
+def build_backends(names):
+    backends = {}
+    for name in names:
+        if name == "elevenlabs":
+            api_key = os.getenv("ELEVENLABS_API_KEY")
+            if not api_key:
+                print("Skipping elevenlabs: ELEVENLABS_API_KEY is not set")
+                continue
+            backends[name] = ElevenLabsManager(api_key=api_key)
+        elif name == "espeak":
+            if not EspeakTTS.available():
+                print("Skipping espeak: espeak-ng is not installed")
+                continue
+            backends[name] = EspeakTTS()
+        else:
+            raise ValueError(f"Unknown backend: {name}")
+    return backends
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser("ttsbench")
+    parser.add_argument("--backends", default="elevenlabs,espeak")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+    load_dotenv()
+
+    for name, synthesizer in build_backends(args.backends.split(",")).items():
+        for text in PHRASES:
+            timings = [measure(synthesizer, text) for _ in range(args.repeats)]
+            first = statistics.median(t[0] for t in timings)
+            total = statistics.median(t[1] for t in timings)
+            print(f"{name:>10}  first audio {first * 1000:7.1f} ms  total {total * 1000:7.1f} ms  '{text[:40]}'")
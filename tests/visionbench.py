@@ -0,0 +1,90 @@
+"""
+Compares snapshot preprocessing settings for the vision API.
+
+For each setting the sample frame is downsampled and recompressed in
+memory, and the encoded size, the base64 payload uploaded and the
+preprocessing time are reported. With --request (and OPENAI_API_KEY in the
+environment or .env) each setting is also sent to the vision API and the
+median request latency is measured. Without an image argument a synthetic
+1280x720 frame, the size fswebcam captures, is used.
+
+Usage: python tests/visionbench.py [frame.png] [--repeats 3] [--request]
+                                   [--settings jpeg-512-70-low,webp-768-80-low,...]
+"""
+import argparse
+import base64
+import io
+import os
+import statistics
+import time
+
+from dotenv import load_dotenv
+from PIL import Image, ImageDraw
+
+from heddy.image_preprocessing import ImageSettings, preprocess_image
+from heddy.vision_module import VisionModule
+
+DEFAULT_SETTINGS = "png-1280-0-high,jpeg-1024-85-high,jpeg-768-80-low,jpeg-512-70-low,webp-768-80-low,webp-512-60-low"
+
+def parse_setting(spec):
+    image_format, max_size, quality, detail = spec.split("-")
+    return ImageSettings(max_size=int(max_size), format=image_format, quality=int(quality), detail=detail)
+
+def synthetic_frame():
+    image = Image.new("RGB", (1280, 720), (200, 190, 170))
+    draw = ImageDraw.Draw(image)
+    # Some edges and gradients so the encoders have something to work on
+    for x in range(0, 1280, 8):
+        draw.line([(x, 0), (1280 - x, 720)], fill=(x % 256, (x * 3) % 256, 120))
+    draw.rectangle([400, 200, 880, 520], fill=(40, 60, 90), outline=(255, 255, 255), width=6)
+    draw.text((450, 340), "heddy vision benchmark", fill=(255, 255, 255))
+    output = io.BytesIO()
+    image.save(output, format="PNG")
+    return output.getvalue()
+
+def measure(frame, settings, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        data = preprocess_image(frame, settings)
+        timings.append(time.perf_counter() - start)
+    return data, statistics.median(timings)
+
+def measure_request(api_key, settings, data, repeats):
+    vision_module = VisionModule(openai_api_key=api_key, image_settings=settings)
+    base64_image = base64.b64encode(data).decode("utf-8")
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        vision_module.get_image_description("What's in this image?", base64_image)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser("visionbench")
+    parser.add_argument("image", nargs="?", default=None, help="Sample camera frame; a synthetic one is used otherwise")
+    parser.add_argument("--settings", default=DEFAULT_SETTINGS, help="Comma separated format-size-quality-detail")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--request", action="store_true", help="Also time the vision API request for each setting")
+    args = parser.parse_args()
+    load_dotenv()
+
+    if args.image:
+        with open(args.image, "rb") as image_file:
+            frame = image_file.read()
+    else:
+        frame = synthetic_frame()
+    api_key = os.getenv("OPENAI_API_KEY")
+    if args.request and not api_key:
+        print("Skipping requests: OPENAI_API_KEY is not set")
+        args.request = False
+
+    print(f"frame: {len(frame)} bytes")
+    for spec in args.settings.split(","):
+        settings = parse_setting(spec)
+        data, encode_time = measure(frame, settings, args.repeats)
+        uploaded = len(base64.b64encode(data))
+        line = f"{settings.label:>24}  {len(data):8d} bytes  {uploaded:8d} uploaded  encode {encode_time * 1000:6.1f} ms"
+        if args.request:
+            line += f"  request {measure_request(api_key, settings, data, args.repeats) * 1000:7.1f} ms"
+        print(line)
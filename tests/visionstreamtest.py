@@ -0,0 +1,110 @@
+"""
+Checks the streamed vision path against the local SSE stub in tests/mock_backends.py.
+
+VisionModule posts to the stub's chat completions endpoint, which answers
+with chunked server-sent events at the injected latencies. The description
+must arrive token by token (the first token well before the last), be
+reassembled exactly, record the vision_first_token span, and fail cleanly
+on an error status or a stream that ends early. A fake camera plays back
+a still frame, so no API key or camera is needed.
+
+Usage: python tests/visionstreamtest.py [--first-token 0.3] [--token-interval 0.05]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from PIL import Image
+
+from heddy.io.camera_service import CameraService
+from heddy.tracing import tracer
+from heddy.vision_module import VisionModule
+
+from mock_backends import VISION_DESCRIPTION, BackendStubServer, LatencyProfile
+
+
+def write_frame():
+    path = os.path.join(tempfile.mkdtemp(), "frame.png")
+    Image.new("RGB", (1280, 720), (150, 120, 90)).save(path)
+    return path
+
+def make_vision_module(stub, camera):
+    # The stub ignores the image; the module itself is used unmodified
+    return VisionModule(openai_api_key="unused", camera=camera, api_url=f"{stub.base_url}/v1/chat/completions")
+
+def test_streams_tokens(stub, camera, latency):
+    arrivals = []
+    start = time.perf_counter()
+    text = make_vision_module(stub, camera).describe_captured_image(
+        "What's on my desk?",
+        on_token=lambda token: arrivals.append((time.perf_counter() - start, token))
+    )
+    assert text == VISION_DESCRIPTION, text
+    assert "".join(token for _, token in arrivals) == VISION_DESCRIPTION
+    assert len(arrivals) > 1, "description arrived in one piece"
+    first, last = arrivals[0][0], arrivals[-1][0]
+    assert last - first >= (len(arrivals) - 1) * latency.vision_token_interval * 0.8, "tokens were buffered"
+    print(f"streamed {len(arrivals)} tokens: first after {first * 1000:.0f} ms, last after {last * 1000:.0f} ms")
+
+def test_get_image_description(stub, camera):
+    # The path the assistant backends fall back to when they can't use the image
+    description = make_vision_module(stub, camera).get_image_description("What's on my desk?", "aW1hZ2U=")
+    assert description == VISION_DESCRIPTION, description
+    print("get_image_description: ok")
+
+def test_first_token_span():
+    spans = tracer.summary()
+    assert spans["vision_first_token"]["count"] >= 1
+    assert spans["vision_first_token"]["p50"] < spans["vision_request"]["p50"]
+    print(f"vision_first_token p50 {spans['vision_first_token']['p50'] * 1000:.0f} ms, "
+          f"vision_request p50 {spans['vision_request']['p50'] * 1000:.0f} ms")
+
+def test_without_callback(stub, camera):
+    # Tool outputs use the whole description
+    assert make_vision_module(stub, camera).describe_captured_image("What's on my desk?") == VISION_DESCRIPTION
+    print("full description: ok")
+
+def test_error_status(stub, camera):
+    stub.server.completion_status = 500
+    tokens = []
+    try:
+        text = make_vision_module(stub, camera).describe_captured_image("What's on my desk?", on_token=tokens.append)
+    finally:
+        stub.server.completion_status = 200
+    assert text == "Description not available or wrong response format.", text
+    # The error message is passed on in one piece so it still gets spoken
+    assert tokens == [text], tokens
+    print("error status: ok")
+
+def test_truncated_stream(stub, camera):
+    stub.server.completion_truncated = True
+    try:
+        description = make_vision_module(stub, camera).request_description("What's on my desk?", "aW1hZ2U=")
+    finally:
+        stub.server.completion_truncated = False
+    # What arrived is kept (it may already have been spoken) but marked incomplete
+    assert VISION_DESCRIPTION.startswith(description.text) and description.text != VISION_DESCRIPTION, description
+    assert not description.complete
+    print("truncated stream: ok")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser("visionstreamtest")
+    parser.add_argument("--first-token", type=float, default=0.3)
+    parser.add_argument("--token-interval", type=float, default=0.05)
+    args = parser.parse_args()
+
+    latency = LatencyProfile(vision_first_token=args.first_token, vision_token_interval=args.token_interval)
+    stub = BackendStubServer(latency).start()
+    camera = CameraService(device=write_frame(), fps=30).start()
+    try:
+        test_streams_tokens(stub, camera, latency)
+        test_first_token_span()
+        test_without_callback(stub, camera)
+        test_get_image_description(stub, camera)
+        test_error_status(stub, camera)
+        test_truncated_stream(stub, camera)
+    finally:
+        camera.close()
+        stub.shutdown()
+    print("all vision streaming tests passed")
@@ -0,0 +1,63 @@
+"""
+Reports faster-whisper load time and real-time factor per configuration.
+
+Every configuration is loaded (including the warm-up inference), then each
+WAV file is transcribed `--repeats` times. RTF is decode time divided by
+audio duration; below 1.0 is faster than real time. By default the WAV
+files bundled in the repository root are used.
+
+Usage: python tests/whisperbench.py [--models tiny,base,small] [--beams 1,4] [--threads 0,4] [wav ...]
+"""
+import argparse
+import glob
+import os
+import time
+
+from heddy.speech_to_text.faster_whisper_transcriber import WhisperTranscriber
+from streamingstttest import SAMPLE_RATE, load_pcm16k
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+def benchmark(model_size, beam_size, cpu_threads, compute_type, wav_files, repeats):
+    start = time.perf_counter()
+    transcriber = WhisperTranscriber(
+        model_size=model_size,
+        compute_type=compute_type,
+        beam_size=beam_size,
+        cpu_threads=cpu_threads
+    )
+    load_time = time.perf_counter() - start
+
+    for path in wav_files:
+        pcm = load_pcm16k(path)
+        duration = len(pcm) / (SAMPLE_RATE * 2)
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            transcriber.transcribe(pcm)
+            timings.append(time.perf_counter() - start)
+        print(
+            f"{model_size:>8} beam={beam_size} threads={cpu_threads:<2} "
+            f"load={load_time:6.2f}s {os.path.basename(path):>18} "
+            f"({duration:5.2f}s) first RTF={timings[0] / duration:5.2f} "
+            f"best RTF={min(timings) / duration:5.2f}"
+        )
+
+def parse_list(value, cast=str):
+    return [cast(item) for item in value.split(",") if item]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser("whisperbench")
+    parser.add_argument("--models", default="tiny,base,small,medium")
+    parser.add_argument("--beams", default="1,4")
+    parser.add_argument("--threads", default="0")
+    parser.add_argument("--compute-type", default="int8")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("wav", nargs="*")
+    args = parser.parse_args()
+
+    wav_files = args.wav or sorted(glob.glob(os.path.join(REPO_ROOT, "*.wav")))
+    for model_size in parse_list(args.models):
+        for beam_size in parse_list(args.beams, int):
+            for cpu_threads in parse_list(args.threads, int):
+                benchmark(model_size, beam_size, cpu_threads, args.compute_type, wav_files, args.repeats)